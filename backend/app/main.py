@@ -3,51 +3,305 @@ Trip Optimizer Backend API - Orchestrator Service
 Routes requests between frontend and microservices (Auth API, Database API, Storage API)
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Header, Body
+from fastapi import FastAPI, HTTPException, Depends, Header, Body, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field
+from contextlib import asynccontextmanager
 import uvicorn
 import os
+import asyncio
+import base64
+import contextvars
+import functools
+import random
+import time
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import httpx
-from datetime import datetime
-from typing import Optional
+import orjson
+import hashlib
+from cachetools import TLRUCache
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env for local runs; in Docker/Kubernetes the
+# environment is injected (PYTHON_ENV=production) and there is no file to read
+if os.getenv("PYTHON_ENV", "development") != "production":
+    load_dotenv()
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib json encoder"""
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+# Log records are handed to a queue and written by a listener thread, so a slow
+# stderr never blocks the event loop
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+log_queue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+
+# HTTP client configuration - per-phase timeouts (seconds) so a stuck connect or
+# pool wait fails quickly instead of holding the request for a blanket 30s
+HTTP_TIMEOUT = httpx.Timeout(
+    connect=float(os.getenv("HTTP_CONNECT_TIMEOUT", "2.0")),
+    read=float(os.getenv("HTTP_READ_TIMEOUT", "10.0")),
+    write=float(os.getenv("HTTP_WRITE_TIMEOUT", "5.0")),
+    pool=float(os.getenv("HTTP_POOL_TIMEOUT", "1.0"))
+)
+
+def read_budget(env_name: str, default: str) -> httpx.Timeout:
+    """Shared connect/write/pool limits with an upstream-specific read timeout"""
+    return httpx.Timeout(
+        connect=HTTP_TIMEOUT.connect,
+        read=float(os.getenv(env_name, default)),
+        write=HTTP_TIMEOUT.write,
+        pool=HTTP_TIMEOUT.pool
+    )
+
+# Per-upstream budgets: token checks and auth calls should answer fast, Database API
+# reads get more room, and writes/uploads that do real work keep the old 30s read
+AUTH_TIMEOUT = read_budget("AUTH_READ_TIMEOUT", "3.0")
+DB_TIMEOUT = read_budget("DB_READ_TIMEOUT", "10.0")
+DB_WRITE_TIMEOUT = read_budget("DB_WRITE_READ_TIMEOUT", "30.0")
+STORAGE_TIMEOUT = read_budget("STORAGE_READ_TIMEOUT", "30.0")
+# Connection attempts retried by the transport (connect errors only, never a sent request)
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+# Extra attempts for idempotent requests whose answer got lost (see RetryTransport), and the
+# base of the full-jitter backoff between them in seconds
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "2"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.05"))
+# Seconds an incoming request may spend on upstream calls in total (clients can ask for
+# less with X-Deadline-Ms), and the least budget worth starting another call with
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "30.0"))
+MIN_CALL_BUDGET = 0.005
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=100, max_connections=500, keepalive_expiry=30)
+# "httpx" (default) or "aiohttp" - the latter keeps the httpx API but does the socket I/O with aiohttp
+HTTP_TRANSPORT = os.getenv("HTTP_TRANSPORT", "httpx").lower()
+# Offer HTTP/2 to upstreams (negotiated via TLS ALPN, falls back to HTTP/1.1)
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+def build_transport() -> httpx.AsyncBaseTransport:
+    """Build the transport used by the shared upstream HTTP client"""
+    if HTTP_TRANSPORT == "aiohttp":
+        from httpx_aiohttp import AiohttpTransport
+        transport = AiohttpTransport(limits=HTTP_LIMITS)
+    else:
+        # HTTP/2 is negotiated via ALPN, so it only kicks in for https:// upstreams;
+        # plain http:// service URLs keep using pooled HTTP/1.1 keep-alive connections
+        transport = httpx.AsyncHTTPTransport(limits=HTTP_LIMITS, http2=HTTP2_ENABLED, retries=MAX_RETRIES)
+    # Breaker outermost so an open circuit fails fast and a whole retry chain counts once;
+    # retries outside the bulkhead so backing off doesn't hold a slot; the deadline is
+    # applied last so each attempt gets whatever budget is left after waiting
+    return BreakerTransport(
+        RetryTransport(BulkheadTransport(DeadlineTransport(transport), UPSTREAM_CONCURRENCY)),
+        UPSTREAM_BREAKERS
+    )
+
+def render_status_bodies(app: FastAPI):
+    """Pre-serialize the / and /health responses for the current second"""
+    now_iso = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    app.state.root_body = orjson.dumps({
+        "service": "Trip Optimizer Backend API",
+        "version": "1.0.0",
+        "description": "Lightweight orchestrator service for coordinating microservice requests",
+        "status": "operational",
+        "timestamp": now_iso
+    })
+    app.state.health_body = orjson.dumps({
+        "status": "healthy",
+        "service": "backend-orchestrator",
+        "timestamp": now_iso,
+        "version": "1.0.0"
+    })
+
+async def tick_clock(app: FastAPI):
+    """Refresh the bodies served by / and /health once per second"""
+    while True:
+        render_status_bodies(app)
+        await asyncio.sleep(1)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared upstream HTTP client on startup and close it on shutdown"""
+    log_listener.start()
+    # One pooled client for the whole process so keep-alive connections to the
+    # Auth/Database/Storage APIs are reused across requests
+    app.state.http_client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, transport=build_transport())
+    if HTTP2_ENABLED and HTTP_TRANSPORT == "httpx":
+        plain_http = [url for url in (CONFIG.auth_api_url, CONFIG.db_api_url, CONFIG.storage_api_url) if url.startswith("http://")]
+        if plain_http:
+            logger.info("HTTP/2 needs TLS; these upstreams will use HTTP/1.1 keep-alive: %s", ", ".join(plain_http))
+    # In-process client used by /batch to run sub-requests through this app's own routes
+    app.state.batch_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://orchestrator",
+        timeout=HTTP_TIMEOUT
+    )
+    # Optional response cache for read-heavy proxy routes
+    app.state.redis = aioredis.from_url(REDIS_URL) if REDIS_URL else None
+    # Probes hit /health constantly, so its body is built here rather than per request
+    render_status_bodies(app)
+    clock_task = asyncio.create_task(tick_clock(app))
+    yield
+    clock_task.cancel()
+    await app.state.batch_client.aclose()
+    await app.state.http_client.aclose()
+    if app.state.redis is not None:
+        await app.state.redis.aclose()
+    log_listener.stop()
 
 app = FastAPI(
     title="Trip Optimizer Backend API",
     description="Lightweight orchestrator service for coordinating microservice requests",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configuration from environment variables
-FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
-API_HOST = os.getenv("API_HOST", "0.0.0.0")
-API_PORT = int(os.getenv("API_PORT", "8000"))
-AUTH_API_URL = os.getenv("AUTH_API_URL", "http://localhost:8003")
-DATABASE_API_URL = os.getenv("DATABASE_API_URL", "http://localhost:8002")
-STORAGE_API_URL = os.getenv("STORAGE_API_URL", "http://localhost:8001")
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Service settings, read from the environment once at import"""
+    frontend_url: str
+    api_host: str
+    api_port: int
+    auth_api_url: str
+    db_api_url: str
+    storage_api_url: str
+
+CONFIG = Config(
+    frontend_url=os.getenv("FRONTEND_URL", "http://localhost:3000"),
+    api_host=os.getenv("API_HOST", "0.0.0.0"),
+    api_port=int(os.getenv("API_PORT", "8000")),
+    auth_api_url=os.getenv("AUTH_API_URL", "http://localhost:8003"),
+    db_api_url=os.getenv("DATABASE_API_URL", "http://localhost:8002"),
+    storage_api_url=os.getenv("STORAGE_API_URL", "http://localhost:8001")
+)
+
+# Upstream endpoints, parsed once instead of per request - httpx reuses a URL
+# object as-is but re-parses a string on every call. Path-specific URLs are
+# still formatted per request (f"{INVOICES_URL}/{invoice_id}").
+AUTH_VERIFY_URL = httpx.URL(f"{CONFIG.auth_api_url}/api/v1/auth/verify")
+AUTH_REGISTER_URL = httpx.URL(f"{CONFIG.auth_api_url}/api/v1/auth/register")
+AUTH_LOGIN_URL = httpx.URL(f"{CONFIG.auth_api_url}/api/v1/auth/login")
+AUTH_PROFILE_URL = httpx.URL(f"{CONFIG.auth_api_url}/api/v1/auth/profile")
+AUTH_LOGOUT_URL = httpx.URL(f"{CONFIG.auth_api_url}/api/v1/auth/logout")
+
+STORAGE_UPLOAD_URL = httpx.URL(f"{CONFIG.storage_api_url}/api/v1/upload/single")
+STORAGE_FILES_URL = httpx.URL(f"{CONFIG.storage_api_url}/api/v1/upload/list")
+
+TRIPS_URL = httpx.URL(f"{CONFIG.db_api_url}/api/trips")
+INVOICES_URL = httpx.URL(f"{CONFIG.db_api_url}/api/invoices")
+USERS_URL = httpx.URL(f"{CONFIG.db_api_url}/api/users")
+
+# Upstream bodies above this size are decoded in a worker thread instead of on the event loop
+LARGE_BODY_BYTES = 256 * 1024
+
+# Fixed response bodies, serialized once
+LOGOUT_BODY = orjson.dumps({"success": True, "message": "Logged out successfully"})
+
+# Bodies are serialized with orjson and sent as raw content with this header
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Redis response cache for GET proxies (unset REDIS_URL to disable). Requests
+# sent with Cache-Control: no-cache skip it; writes drop the affected user's entries.
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_PREFIX = "trip-opt"
+TRIPS_LIST_CACHE_TTL = int(os.getenv("TRIPS_LIST_CACHE_TTL", "15"))
+TRIP_CACHE_TTL = int(os.getenv("TRIP_CACHE_TTL", "30"))
+INVOICES_CACHE_TTL = int(os.getenv("INVOICES_CACHE_TTL", "30"))
+USERS_CACHE_TTL = int(os.getenv("USERS_CACHE_TTL", "30"))
+FILES_CACHE_TTL = int(os.getenv("FILES_CACHE_TTL", "30"))
+# How long an expired entry is kept to answer with while the upstream is down
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", "300"))
+
+# Seconds a successful token verification is reused for (0 disables the cache). Each
+# worker has its own cache, so logouts are shared through Redis when REDIS_URL is set;
+# without it another worker may keep accepting a logged-out token for up to this long
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "30"))
+AUTH_CACHE_SIZE = 10000
+# Extra seconds a logout is remembered for, covering verifications still in flight
+AUTH_REVOKE_MARGIN = 60
+
+# Consecutive upstream failures before a service's circuit opens, and seconds it stays open
+AUTH_BREAKER_THRESHOLD = int(os.getenv("AUTH_BREAKER_THRESHOLD", "5"))
+AUTH_BREAKER_TTL = float(os.getenv("AUTH_BREAKER_TTL", "10"))
+DB_BREAKER_THRESHOLD = int(os.getenv("DB_BREAKER_THRESHOLD", "5"))
+DB_BREAKER_TTL = float(os.getenv("DB_BREAKER_TTL", "30"))
+STORAGE_BREAKER_THRESHOLD = int(os.getenv("STORAGE_BREAKER_THRESHOLD", "5"))
+STORAGE_BREAKER_TTL = float(os.getenv("STORAGE_BREAKER_TTL", "30"))
+
+# Concurrent requests each upstream may have in flight, and seconds to wait for a free slot
+UPSTREAM_CONCURRENCY = {
+    "Database": int(os.getenv("DB_MAX_CONCURRENCY", "50")),
+    "Storage": int(os.getenv("STORAGE_MAX_CONCURRENCY", "20")),
+}
+BULKHEAD_WAIT = float(os.getenv("BULKHEAD_WAIT", "0.5"))
 
 # CORS configuration - allow both internal Kubernetes service and external localhost (for port-forwarding)
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",           # External URL (port forwarding)
     "http://frontend-service:3000",    # Internal Kubernetes service URL
-    FRONTEND_URL,                      # From environment variable
+    CONFIG.frontend_url,               # From environment variable
 ]
-# Remove duplicates while preserving order
-CORS_ALLOWED_ORIGINS = list(dict.fromkeys(CORS_ALLOWED_ORIGINS))
+# A set both removes duplicates and makes CORSMiddleware's per-request origin check O(1)
+CORS_ALLOWED_ORIGINS = frozenset(CORS_ALLOWED_ORIGINS)
+
+# Request deadlines - one time budget per incoming request, shared by all of its upstream calls
+request_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+class DeadlineMiddleware:
+    """Start the request's deadline clock (see DeadlineTransport)
+    
+    The budget is REQUEST_DEADLINE seconds, or less if the caller sent X-Deadline-Ms.
+    Requests made from inside another request (/batch) keep the outer deadline if
+    it is sooner.
+    """
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        budget = REQUEST_DEADLINE
+        for name, value in scope["headers"]:
+            if name == b"x-deadline-ms":
+                try:
+                    budget = min(budget, int(value) / 1000)
+                except ValueError:
+                    pass
+                break
+        deadline = time.monotonic() + budget
+        outer = request_deadline.get()
+        token = request_deadline.set(deadline if outer is None else min(outer, deadline))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_deadline.reset(token)
+
+app.add_middleware(DeadlineMiddleware)
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    # Explicit lists (the frontend only sends these) and a day-long preflight cache
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["authorization", "content-type", "x-deadline-ms"],
+    max_age=86400,
 )
 
 # Pydantic models
@@ -65,21 +319,21 @@ class RegisterRequest(BaseModel):
 class LoginResponse(BaseModel):
     success: bool
     message: str
-    user: dict = None
-    accessToken: str = None
-    refreshToken: str = None
+    user: Optional[dict] = None
+    accessToken: Optional[str] = None
+    refreshToken: Optional[str] = None
 
 class RegisterResponse(BaseModel):
     success: bool
     message: str
-    user: dict = None
-    accessToken: str = None
-    refreshToken: str = None
+    user: Optional[dict] = None
+    accessToken: Optional[str] = None
+    refreshToken: Optional[str] = None
 
 class UserProfileResponse(BaseModel):
     success: bool
     message: str
-    user: dict = None
+    user: Optional[dict] = None
 
 # Additional models for trips and invoices
 class TripCreateRequest(BaseModel):
@@ -88,336 +342,775 @@ class TripCreateRequest(BaseModel):
     dates: dict
     budget: dict
     travelers: list
-    tags: list = []
+    tags: list = Field(default_factory=list)
     isPublic: bool = False
 
 class TripUpdateRequest(BaseModel):
-    title: str = None
-    destination: dict = None
-    dates: dict = None
-    budget: dict = None
-    travelers: list = None
-    tags: list = None
-    isPublic: bool = None
+    title: Optional[str] = None
+    destination: Optional[dict] = None
+    dates: Optional[dict] = None
+    budget: Optional[dict] = None
+    travelers: Optional[list] = None
+    tags: Optional[list] = None
+    isPublic: Optional[bool] = None
 
 class InvoiceCreateRequest(BaseModel):
-    invoiceNumber: str = None
+    invoiceNumber: Optional[str] = None
     invoiceDate: str
     dueDate: str
     originalFileName: str
     filePath: str
-    fileSize: int = None
-    fileType: str = None
-    mimeType: str = None
-    tripId: str = None
-    category: str = None
-    tags: list = []
+    fileSize: Optional[int] = None
+    fileType: Optional[str] = None
+    mimeType: Optional[str] = None
+    tripId: Optional[str] = None
+    category: Optional[str] = None
+    tags: list = Field(default_factory=list)
 
 class InvoiceUpdateRequest(BaseModel):
-    invoiceNumber: str = None
-    invoiceDate: str = None
-    dueDate: str = None
-    originalFileName: str = None
-    filePath: str = None
-    fileSize: int = None
-    fileType: str = None
-    mimeType: str = None
-    tripId: str = None
-    category: str = None
-    tags: list = None
-
-# HTTP client configuration
-HTTP_TIMEOUT = 30.0
-MAX_RETRIES = 3
+    invoiceNumber: Optional[str] = None
+    invoiceDate: Optional[str] = None
+    dueDate: Optional[str] = None
+    originalFileName: Optional[str] = None
+    filePath: Optional[str] = None
+    fileSize: Optional[int] = None
+    fileType: Optional[str] = None
+    mimeType: Optional[str] = None
+    tripId: Optional[str] = None
+    category: Optional[str] = None
+    tags: Optional[list] = None
+
+class BatchItem(BaseModel):
+    method: str
+    path: str
+    body: Optional[dict] = None
+
+MAX_BATCH_ITEMS = 100
 
 # HTTP client for API calls
-def get_http_client():
-    """Get configured HTTP client for microservice communication"""
-    return httpx.AsyncClient(
-        timeout=HTTP_TIMEOUT,
-        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+def get_client(request: Request) -> httpx.AsyncClient:
+    """Get the shared HTTP client for microservice communication"""
+    return request.app.state.http_client
+
+async def fan_out(*coros) -> list:
+    """Run independent upstream calls concurrently and return their results in order
+    
+    Handlers that need more than one upstream call should go through this instead of
+    awaiting them one after another, so they cost the slowest call rather than the sum.
+    Exceptions are returned in place of results so one failure doesn't cancel the rest.
+    """
+    return await asyncio.gather(*coros, return_exceptions=True)
+
+async def read_json(response: httpx.Response):
+    """Decode an upstream JSON body with orjson, off the event loop when it is large"""
+    if len(response.content) > LARGE_BODY_BYTES:
+        return await asyncio.to_thread(orjson.loads, response.content)
+    return orjson.loads(response.content)
+
+def json_or_message(response: httpx.Response, fallback: str) -> dict:
+    """Decode a JSON upstream body, or wrap fallback as {"message": ...} for anything else"""
+    content_type = response.headers.get("content-type")
+    if content_type is not None and content_type[:16] == "application/json":
+        return orjson.loads(response.content)
+    return {"message": fallback}
+
+def upstream_error(response: httpx.Response, error_message: str) -> HTTPException:
+    """Turn an upstream error response into an HTTPException carrying its message"""
+    error_data = json_or_message(response, error_message)
+    return HTTPException(
+        status_code=response.status_code,
+        detail=error_data.get("message", error_message)
+    )
+
+def relay_body(response: httpx.Response) -> Response:
+    """Return an already-read upstream body to the caller as-is, without decoding it"""
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type", "application/json")
+    )
+
+async def relay_stream(
+    client: httpx.AsyncClient,
+    upstream_request: httpx.Request,
+    ok_status: int,
+    error_message: str
+) -> StreamingResponse:
+    """Send a request upstream and stream its body back without decoding it
+    
+    Only the error branch is read and parsed; a successful body is passed through
+    as raw bytes and the upstream connection is released once it has been sent.
+    """
+    response = await client.send(upstream_request, stream=True)
+    
+    if response.status_code != ok_status:
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        raise upstream_error(response, error_message)
+    
+    headers = {"content-type": response.headers.get("content-type", "application/json")}
+    # aiter_raw() yields the bytes as sent, so any compression has to be declared too
+    if "content-encoding" in response.headers:
+        headers["content-encoding"] = response.headers["content-encoding"]
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        headers=headers,
+        background=BackgroundTask(response.aclose)
+    )
+
+# Response cache
+async def cache_read(redis_client, key: str) -> Optional[dict]:
+    """Fetch a cached upstream response, treating Redis errors as a miss"""
+    try:
+        entry = await redis_client.hgetall(key)
+    except RedisError as e:
+        logger.warning("Cache read failed for %s: %s", key, e)
+        return None
+    return entry or None
+
+async def cache_write(redis_client, key: str, response: httpx.Response):
+    """Store an upstream response's status, content type and body under key"""
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                "status": response.status_code,
+                "content_type": response.headers.get("content-type", "application/json"),
+                "body": response.content,
+                "stored_at": time.time()
+            })
+            pipe.expire(key, CACHE_STALE_TTL)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Cache write failed for %s: %s", key, e)
+
+async def cache_invalidate(redis_client, prefix: str):
+    """Drop every cached response whose key starts with prefix"""
+    if redis_client is None:
+        return
+    try:
+        keys = [key async for key in redis_client.scan_iter(match=f"{prefix}*", count=500)]
+        if keys:
+            await redis_client.unlink(*keys)
+    except RedisError as e:
+        logger.warning("Cache invalidation failed for %s: %s", prefix, e)
+
+# Upstream GETs currently in progress, keyed like the response cache
+upstream_inflight: dict = {}
+
+async def send_shared(client: httpx.AsyncClient, key: str, upstream_request: httpx.Request) -> httpx.Response:
+    """Send a GET, or join an identical one (same key) that is already in flight"""
+    fetch = upstream_inflight.get(key)
+    if fetch is None:
+        fetch = asyncio.ensure_future(client.send(upstream_request))
+        upstream_inflight[key] = fetch
+        fetch.add_done_callback(lambda _: upstream_inflight.pop(key, None))
+    # shield() so one caller disconnecting doesn't cancel the fetch for the others
+    return await asyncio.shield(fetch)
+
+def cached_response(entry: dict, stale: bool = False) -> Response:
+    headers = {"Warning": '110 - "Response is Stale"'} if stale else None
+    return Response(
+        content=entry[b"body"],
+        status_code=int(entry[b"status"]),
+        media_type=entry[b"content_type"].decode(),
+        headers=headers
     )
 
-# Authentication dependency
-async def get_current_user(authorization: Optional[str] = Header(None)):
-    """Validate JWT token and return current user information"""
+async def relay_cached(
+    redis_client,
+    client: httpx.AsyncClient,
+    cache_key: str,
+    ttl: int,
+    upstream_request: httpx.Request,
+    ok_status: int,
+    error_message: str
+) -> Response:
+    """Serve a GET proxy from the Redis cache, falling back to the upstream
+    
+    Fresh entries (younger than ttl) are returned without an upstream call. Older ones
+    are kept for CACHE_STALE_TTL and served with a Warning: 110 header if the upstream
+    cannot be reached, is skipped (open circuit, full bulkhead, spent deadline) or
+    answers with one of BREAKER_FAILURE_STATUSES. Misses go through send_shared(), so concurrent requests for the
+    same cache_key cost one upstream call whether or not Redis is configured.
+    """
+    entry = None
+    if redis_client is not None:
+        entry = await cache_read(redis_client, cache_key)
+        if entry is not None and time.time() - float(entry[b"stored_at"]) < ttl:
+            return cached_response(entry)
+    
+    try:
+        response = await send_shared(client, cache_key, upstream_request)
+    except (httpx.RequestError, UpstreamUnavailableError):
+        if entry is not None:
+            return cached_response(entry, stale=True)
+        raise
+    
+    if response.status_code != ok_status:
+        if entry is not None and response.status_code in BREAKER_FAILURE_STATUSES:
+            return cached_response(entry, stale=True)
+        raise upstream_error(response, error_message)
+    
+    if redis_client is not None:
+        await cache_write(redis_client, cache_key, response)
+    return relay_body(response)
+
+class UpstreamUnavailableError(Exception):
+    """Raised instead of calling an upstream service that can't take the request now"""
+
+# Circuit breakers
+class CircuitOpenError(UpstreamUnavailableError):
+    """Raised instead of calling an upstream service whose circuit is open"""
+    def __init__(self, service: str):
+        super().__init__(service)
+        self.service = service
+
+class CircuitBreaker:
+    """Fail fast while an upstream service keeps failing
+    
+    After `threshold` consecutive failures the circuit opens and check() raises
+    CircuitOpenError for `ttl` seconds. The first call after that goes through as a
+    trial: success closes the circuit, failure opens it again.
+    """
+    def __init__(self, service: str, threshold: int, ttl: float):
+        self.service = service
+        self.threshold = threshold
+        self.ttl = ttl
+        self.failures = 0
+        self.opened_at = None
+    
+    def check(self):
+        if self.opened_at is not None:
+            now = time.monotonic()
+            if now - self.opened_at < self.ttl:
+                raise CircuitOpenError(self.service)
+            # Half-open: let this call through, keep failing others fast until it finishes
+            self.opened_at = now
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+# Answers that mean the service itself is unhealthy; other 4xx/5xx are normal replies
+BREAKER_FAILURE_STATUSES = frozenset((502, 503, 504))
+
+class BreakerTransport(httpx.AsyncBaseTransport):
+    """Send each upstream request through its service's circuit breaker
+    
+    Connection errors, timeouts and BREAKER_FAILURE_STATUSES count as failures. Pool
+    timeouts don't - they mean this process is out of connections, not that the
+    service is down.
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport, breakers: dict):
+        self.transport = transport
+        self.breakers = breakers
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        breaker = self.breakers.get(upstream_service(request))
+        if breaker is None:
+            return await self.transport.handle_async_request(request)
+        breaker.check()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.PoolTimeout:
+            raise
+        except httpx.RequestError:
+            breaker.record_failure()
+            raise
+        if response.status_code in BREAKER_FAILURE_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+    
+    async def aclose(self):
+        await self.transport.aclose()
+
+class BulkheadFullError(UpstreamUnavailableError):
+    def __init__(self, service: str):
+        super().__init__(f"{service} bulkhead full")
+        self.service = service
+
+class BulkheadTransport(httpx.AsyncBaseTransport):
+    """Cap how many requests each upstream service can have waiting on an answer
+    
+    Every service gets its own semaphore, so a flood of slow uploads can't take the
+    connection slots invoice reads need. A request that can't get a slot within
+    BULKHEAD_WAIT seconds fails with BulkheadFullError. Slots are held until the
+    response headers arrive; services without a limit pass straight through.
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport, limits: dict):
+        self.transport = transport
+        self.semaphores = {service: asyncio.Semaphore(limit) for service, limit in limits.items()}
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        service = upstream_service(request)
+        semaphore = self.semaphores.get(service)
+        if semaphore is None:
+            return await self.transport.handle_async_request(request)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), BULKHEAD_WAIT)
+        except asyncio.TimeoutError:
+            raise BulkheadFullError(service) from None
+        try:
+            return await self.transport.handle_async_request(request)
+        finally:
+            semaphore.release()
+    
+    async def aclose(self):
+        await self.transport.aclose()
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+# Errors where the request may have been sent but no usable answer came back
+RETRYABLE_ERRORS = (httpx.ReadError, httpx.WriteError, httpx.RemoteProtocolError)
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Retry idempotent upstream requests that failed in transit
+    
+    Dropped keep-alive connections and 502/503/504 answers are retried up to
+    UPSTREAM_RETRIES times with full-jitter exponential backoff. Other methods are
+    never retried here - connect failures, where nothing was sent yet, are already
+    retried for every method by the underlying transport (MAX_RETRIES).
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in IDEMPOTENT_METHODS:
+            return await self.transport.handle_async_request(request)
+        for attempt in range(UPSTREAM_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt))
+            last_attempt = attempt == UPSTREAM_RETRIES
+            try:
+                response = await self.transport.handle_async_request(request)
+            except RETRYABLE_ERRORS:
+                if last_attempt:
+                    raise
+                continue
+            if last_attempt or response.status_code not in BREAKER_FAILURE_STATUSES:
+                return response
+            await response.aclose()
+    
+    async def aclose(self):
+        await self.transport.aclose()
+
+class DeadlineExceededError(UpstreamUnavailableError):
+    def __init__(self, service: str):
+        super().__init__(f"Deadline exceeded before calling {service}")
+        self.service = service
+
+class DeadlineTransport(httpx.AsyncBaseTransport):
+    """Fit each upstream call into what is left of the request's deadline
+    
+    Every timeout phase is capped at the remaining budget, which is also passed on
+    as X-Deadline-Ms. Once less than MIN_CALL_BUDGET is left the call is skipped
+    with DeadlineExceededError instead of doing work nobody will wait for.
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        deadline = request_deadline.get()
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= MIN_CALL_BUDGET:
+                raise DeadlineExceededError(upstream_service(request))
+            request.extensions["timeout"] = {
+                phase: remaining if limit is None else min(limit, remaining)
+                for phase, limit in request.extensions.get("timeout", {}).items()
+            }
+            request.headers["X-Deadline-Ms"] = str(int(remaining * 1000))
+        return await self.transport.handle_async_request(request)
+    
+    async def aclose(self):
+        await self.transport.aclose()
+
+UPSTREAM_BREAKERS = {
+    "Auth": CircuitBreaker("Auth", AUTH_BREAKER_THRESHOLD, AUTH_BREAKER_TTL),
+    "Database": CircuitBreaker("Database", DB_BREAKER_THRESHOLD, DB_BREAKER_TTL),
+    "Storage": CircuitBreaker("Storage", STORAGE_BREAKER_THRESHOLD, STORAGE_BREAKER_TTL),
+}
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return ORJSONResponse(status_code=503, content={"detail": f"{exc.service} service circuit open"})
+
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceededError):
+    return ORJSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+
+@app.exception_handler(BulkheadFullError)
+async def bulkhead_full_handler(request: Request, exc: BulkheadFullError):
+    return ORJSONResponse(status_code=503, content={"detail": f"{exc.service} service busy"})
+
+# Upstream errors - handlers let httpx exceptions propagate and these turn them into responses
+UPSTREAM_SERVICES = (
+    (CONFIG.auth_api_url, "Auth"),
+    (CONFIG.db_api_url, "Database"),
+    (CONFIG.storage_api_url, "Storage"),
+)
+
+TIMEOUT_PHASES = {
+    httpx.ConnectTimeout: "connect",
+    httpx.ReadTimeout: "read",
+    httpx.WriteTimeout: "write",
+    httpx.PoolTimeout: "pool",
+}
+
+def upstream_service(upstream_request: httpx.Request) -> str:
+    """Name the microservice a failed upstream request was sent to"""
+    url = str(upstream_request.url)
+    for base_url, service in UPSTREAM_SERVICES:
+        if url.startswith(base_url):
+            return service
+    return "Upstream"
+
+@app.exception_handler(httpx.TimeoutException)
+async def upstream_timeout_handler(request: Request, exc: httpx.TimeoutException):
+    """Log which phase of an upstream call timed out and answer 504
+    
+    A pool timeout means this process ran out of connections rather than the
+    upstream being slow, so it is answered with 503 straight away instead.
+    """
+    service = upstream_service(exc.request)
+    phase = TIMEOUT_PHASES.get(type(exc), "unknown")
+    logger.warning("Upstream %s timeout: %s %s", phase, exc.request.method, exc.request.url)
+    if isinstance(exc, httpx.PoolTimeout):
+        return ORJSONResponse(status_code=503, content={"detail": f"{service} service timeout (connection pool exhausted)"})
+    return ORJSONResponse(status_code=504, content={"detail": f"{service} service timeout"})
+
+@app.exception_handler(httpx.RequestError)
+async def upstream_unavailable_handler(request: Request, exc: httpx.RequestError):
+    service = upstream_service(exc.request)
+    return ORJSONResponse(status_code=503, content={"detail": f"{service} service unavailable: {str(exc)}"})
+
+def auth_entry_expiry(_key, entry: tuple, now: float) -> float:
+    """Keep a verified user for AUTH_CACHE_TTL seconds, but never past the token's own exp"""
+    return min(now + AUTH_CACHE_TTL, entry[1])
+
+# (verified user, token exp) keyed by token hash - see get_current_user
+auth_cache = TLRUCache(maxsize=AUTH_CACHE_SIZE, ttu=auth_entry_expiry, timer=time.time) if AUTH_CACHE_TTL > 0 else None
+
+# Token verifications currently in progress, shared by concurrent requests
+auth_inflight: dict = {}
+
+def token_expiry(token: str) -> float:
+    """Read the exp claim from a JWT without checking it (the Auth API does that)
+    
+    Returns infinity when there is no readable exp, leaving AUTH_CACHE_TTL as the only limit.
+    """
+    try:
+        payload = token.split(".")[1]
+        return float(orjson.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return float("inf")
+
+def token_cache_key(token: str) -> bytes:
+    """Hash a bearer token so the raw token is never kept as a cache key"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def revoked_key(cache_key: bytes) -> str:
+    """Redis key marking a logged-out token, by the same hash as the auth cache"""
+    return f"{CACHE_PREFIX}:revoked:{cache_key.hex()}"
+
+async def token_revoked(redis_client, cache_key: bytes) -> bool:
+    """Whether any worker has logged the token out, treating Redis errors as revoked
+    
+    A revoked answer only costs a fresh check with the Auth API, so that is the safe side.
+    """
+    if redis_client is None:
+        return False
+    try:
+        return bool(await redis_client.exists(revoked_key(cache_key)))
+    except RedisError as e:
+        logger.warning("Token revocation check failed: %s", e)
+        return True
+
+async def revoke_token(redis_client, token: str, cache_key: bytes):
+    """Drop a token from this worker's auth cache and tell the other workers via Redis"""
+    auth_inflight.pop(cache_key, None)
+    if auth_cache is not None:
+        auth_cache.pop(cache_key, None)
+    if redis_client is None or auth_cache is None:
+        return
+    # Other workers' entries can't outlive the token or AUTH_CACHE_TTL after their check
+    ttl = min(token_expiry(token) - time.time(), AUTH_CACHE_TTL + AUTH_REVOKE_MARGIN)
+    if ttl <= 0:
+        return
+    try:
+        await redis_client.set(revoked_key(cache_key), 1, ex=int(ttl) + 1)
+    except RedisError as e:
+        logger.warning("Token revocation write failed: %s", e)
+
+def user_headers(user_data: dict) -> dict:
+    """Headers identifying the verified user to the Database API, which trusts them as-is
+    
+    Request bodies are sent as pre-encoded JSON bytes, so the content type is always set.
+    The bearer token is added per request by get_user_headers, so it is never cached.
+    """
+    return {
+        "Content-Type": "application/json",
+        "x-user-id": user_data["_user_id_str"],
+        "x-user-email": user_data.get('email', ''),
+        "x-user-role": user_data.get('role', 'user')
+    }
+
+def get_redis(request: Request):
+    """Get the Redis response cache client, or None when caching is disabled"""
+    return request.app.state.redis
+
+def get_read_cache(request: Request, cache_control: Optional[str] = Header(None)):
+    """get_redis() for GET proxies, or None when the client sent Cache-Control: no-cache"""
+    if cache_control and "no-cache" in cache_control.lower():
+        return None
+    return request.app.state.redis
+
+def cache_prefix(resource: str, current_user: dict) -> str:
+    """Cache key prefix for one user's responses - keys must never be shared across users"""
+    return f"{CACHE_PREFIX}:{resource}:{current_user['_user_id_str']}:"
+
+# Authentication dependencies
+async def get_bearer_token(authorization: Optional[str] = Header(None)) -> str:
+    """Extract the Bearer token from the Authorization header without calling the Auth API"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
             status_code=401, 
             detail="Access token required. Please provide a valid Bearer token."
         )
     
-    token = authorization.split(" ")[1]
+    return authorization[7:]  # len("Bearer ")
+
+async def verify_token(token: str, cache_key: bytes, client: httpx.AsyncClient) -> dict:
+    """Ask the Auth API who a token belongs to and cache the answer"""
+    response = await client.post(
+        AUTH_VERIFY_URL,
+        timeout=AUTH_TIMEOUT,
+        headers={"Authorization": f"Bearer {token}"}
+    )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{AUTH_API_URL}/api/v1/auth/verify",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                user_data = data["data"]["user"]
-                user_data["accessToken"] = token  # Store the token for later use
-                return user_data
-            elif response.status_code == 401:
-                raise HTTPException(status_code=401, detail="Invalid or expired token")
-            else:
-                raise HTTPException(
-                    status_code=response.status_code, 
-                    detail=f"Token validation failed: {response.text}"
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Auth service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Auth service unavailable: {str(e)}")
+    if response.status_code == 200:
+        data = await read_json(response)
+        user_data = data["data"]["user"]
+        user_id = user_data.get('_id') or user_data.get('id')
+        user_data["_user_id_str"] = str(user_id) if user_id else ""
+        # Built once per verified token and reused by every request that presents it
+        user_data["_headers"] = user_headers(user_data)
+        # logout() drops the in-flight entry, so a token logged out mid-check isn't cached
+        if auth_cache is not None and cache_key in auth_inflight:
+            auth_cache[cache_key] = (user_data, token_expiry(token))
+        return user_data
+    elif response.status_code == 401:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    else:
+        raise HTTPException(
+            status_code=response.status_code, 
+            detail=f"Token validation failed: {response.text}"
+        )
+
+async def get_current_user(token: str = Depends(get_bearer_token), client: httpx.AsyncClient = Depends(get_client), redis_client=Depends(get_redis)):
+    """Validate JWT token and return current user information
+    
+    Only needed in front of the Database/Storage APIs, which trust the x-user-* headers
+    set by this service. Auth API routes verify the token themselves, so the /auth/*
+    relays below forward it with get_bearer_token instead of paying an extra round trip.
+    
+    Successful verifications are cached for AUTH_CACHE_TTL seconds or until the token
+    expires, whichever is sooner, and concurrent requests with the same uncached token
+    share a single in-flight verification. Cache hits are checked against the logouts
+    recorded in Redis, so a token logged out through any worker is verified again.
+    """
+    cache_key = token_cache_key(token)
+    if auth_cache is not None:
+        entry = auth_cache.get(cache_key)
+        if entry is not None:
+            if not await token_revoked(redis_client, cache_key):
+                return {**entry[0], "accessToken": token}
+            auth_cache.pop(cache_key, None)
+    
+    verification = auth_inflight.get(cache_key)
+    if verification is None:
+        verification = asyncio.ensure_future(verify_token(token, cache_key, client))
+        auth_inflight[cache_key] = verification
+        # Only remove our own entry - logout() may have replaced it already
+        verification.add_done_callback(
+            lambda done: auth_inflight.pop(cache_key) if auth_inflight.get(cache_key) is done else None
+        )
+    # shield() so a caller that disconnects doesn't cancel the check for everyone else
+    user_data = await asyncio.shield(verification)
+    return {**user_data, "accessToken": token}  # Store the token for later use
+
+def get_user_headers(current_user: dict = Depends(get_current_user)) -> dict:
+    """The verified user's Database API headers, with this request's bearer token added"""
+    return {**current_user["_headers"], "Authorization": f"Bearer {current_user['accessToken']}"}
+
+def db_caller(headers: dict = Depends(get_user_headers), client: httpx.AsyncClient = Depends(get_client)):
+    """Shared client's request() with the verified user's Database API headers and timeout bound in
+    
+    Usage: response = await call("GET", url, params=...)
+    """
+    return functools.partial(client.request, headers=headers, timeout=DB_TIMEOUT)
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """API information and status"""
-    return {
-        "service": "Trip Optimizer Backend API",
-        "version": "1.0.0",
-        "description": "Lightweight orchestrator service for coordinating microservice requests",
-        "status": "operational",
-        "timestamp": datetime.now().isoformat()
-    }
+    return Response(content=request.app.state.root_body, media_type="application/json")
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint for monitoring"""
-    return {
-        "status": "healthy",
-        "service": "backend-orchestrator",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
-    }
+    return Response(content=request.app.state.health_body, media_type="application/json")
 
-@app.post("/auth/register", response_model=RegisterResponse)
-async def register(request: RegisterRequest):
+@app.post("/auth/register", responses={200: {"model": RegisterResponse}})
+async def register(request: RegisterRequest, client: httpx.AsyncClient = Depends(get_client)):
     """Register a new user via Auth API"""
     
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{AUTH_API_URL}/api/v1/auth/register",
-                json={
-                    "username": request.username,
-                    "email": request.email,
-                    "password": request.password,
-                    "firstName": request.firstName,
-                    "lastName": request.lastName
-                }
-            )
-            
-            if response.status_code == 201:
-                data = response.json()
-                return RegisterResponse(
-                    success=True,
-                    message="Registration successful",
-                    user=data["data"]["user"],
-                    accessToken=data["data"]["accessToken"],
-                    refreshToken=data["data"]["refreshToken"]
-                )
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Registration failed"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Registration failed")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Auth service timeout during registration")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Auth service unavailable: {str(e)}")
-
-@app.post("/auth/login", response_model=LoginResponse)
-async def login(request: LoginRequest):
+    response = await client.post(
+        AUTH_REGISTER_URL,
+        timeout=AUTH_TIMEOUT,
+        content=orjson.dumps({
+            "username": request.username,
+            "email": request.email,
+            "password": request.password,
+            "firstName": request.firstName,
+            "lastName": request.lastName
+        }),
+        headers=JSON_HEADERS
+    )
+    
+    if response.status_code == 201:
+        # Reshape the upstream envelope directly; RegisterResponse is only used for the docs
+        data = (await read_json(response))["data"]
+        return ORJSONResponse({
+            "success": True,
+            "message": "Registration successful",
+            "user": data["user"],
+            "accessToken": data["accessToken"],
+            "refreshToken": data["refreshToken"]
+        })
+    else:
+        raise upstream_error(response, "Registration failed")
+
+@app.post("/auth/login", responses={200: {"model": LoginResponse}})
+async def login(request: LoginRequest, client: httpx.AsyncClient = Depends(get_client)):
     """Login user via Auth API"""
     
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{AUTH_API_URL}/api/v1/auth/login",
-                json={
-                    "emailOrUsername": request.username,
-                    "password": request.password
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return LoginResponse(
-                    success=True,
-                    message="Login successful",
-                    user=data["data"]["user"],
-                    accessToken=data["data"]["accessToken"],
-                    refreshToken=data["data"]["refreshToken"]
-                )
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Login failed"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Login failed")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Auth service timeout during login")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Auth service unavailable: {str(e)}")
-
-@app.get("/auth/profile", response_model=UserProfileResponse)
-async def get_profile(authorization: Optional[str] = Header(None)):
-    """Get user profile via Auth API"""
+    response = await client.post(
+        AUTH_LOGIN_URL,
+        timeout=AUTH_TIMEOUT,
+        content=orjson.dumps({
+            "emailOrUsername": request.username,
+            "password": request.password
+        }),
+        headers=JSON_HEADERS
+    )
     
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=401, 
-            detail="Access token required. Please provide a valid Bearer token."
-        )
+    if response.status_code == 200:
+        # Reshape the upstream envelope directly; LoginResponse is only used for the docs
+        data = (await read_json(response))["data"]
+        return ORJSONResponse({
+            "success": True,
+            "message": "Login successful",
+            "user": data["user"],
+            "accessToken": data["accessToken"],
+            "refreshToken": data["refreshToken"]
+        })
+    else:
+        raise upstream_error(response, "Login failed")
+
+@app.get("/auth/profile", responses={200: {"model": UserProfileResponse}})
+async def get_profile(token: str = Depends(get_bearer_token), client: httpx.AsyncClient = Depends(get_client)):
+    """Get user profile via Auth API"""
     
-    token = authorization.split(" ")[1]
+    response = await client.get(
+        AUTH_PROFILE_URL,
+        timeout=AUTH_TIMEOUT,
+        headers={"Authorization": f"Bearer {token}"}
+    )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.get(
-                f"{AUTH_API_URL}/api/v1/auth/profile",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return UserProfileResponse(
-                    success=True,
-                    message="Profile retrieved successfully",
-                    user=data["data"]["user"]
-                )
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to retrieve profile"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to retrieve profile")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Auth service timeout during profile retrieval")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Auth service unavailable: {str(e)}")
+    if response.status_code == 200:
+        # Reshape the upstream envelope directly; UserProfileResponse is only used for the docs
+        data = (await read_json(response))["data"]
+        return ORJSONResponse({
+            "success": True,
+            "message": "Profile retrieved successfully",
+            "user": data["user"]
+        })
+    else:
+        raise upstream_error(response, "Failed to retrieve profile")
 
 @app.put("/auth/profile")
 async def update_profile(
     request: dict = Body(...),
-    authorization: Optional[str] = Header(None)
+    token: str = Depends(get_bearer_token),
+    client: httpx.AsyncClient = Depends(get_client)
 ):
     """Update user profile via Auth API"""
     
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=401, 
-            detail="Access token required. Please provide a valid Bearer token."
-        )
-    
-    token = authorization.split(" ")[1]
-    
-    async with get_http_client() as client:
-        try:
-            response = await client.put(
-                f"{AUTH_API_URL}/api/v1/auth/profile",
-                json=request,
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to update profile"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to update profile")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Auth service timeout during profile update")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Auth service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "PUT",
+        AUTH_PROFILE_URL,
+        timeout=AUTH_TIMEOUT,
+        content=orjson.dumps(request),
+        headers={"Authorization": f"Bearer {token}", **JSON_HEADERS}
+    )
+    return await relay_stream(client, upstream_request, 200, "Failed to update profile")
 
 @app.post("/auth/logout")
 async def logout(
     request: dict = Body(...),
-    authorization: Optional[str] = Header(None)
+    token: str = Depends(get_bearer_token),
+    client: httpx.AsyncClient = Depends(get_client),
+    redis_client=Depends(get_redis)
 ):
     """Logout user via Auth API"""
     
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(
-            status_code=401, 
-            detail="Access token required. Please provide a valid Bearer token."
-        )
+    await revoke_token(redis_client, token, token_cache_key(token))
     
-    token = authorization.split(" ")[1]
+    response = await client.post(
+        AUTH_LOGOUT_URL,
+        timeout=AUTH_TIMEOUT,
+        content=orjson.dumps(request),
+        headers={"Authorization": f"Bearer {token}", **JSON_HEADERS}
+    )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{AUTH_API_URL}/api/v1/auth/logout",
-                json=request,
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 200:
-                return {"success": True, "message": "Logged out successfully"}
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Logout failed"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Logout failed")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Auth service timeout during logout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Auth service unavailable: {str(e)}")
+    if response.status_code == 200:
+        return Response(content=LOGOUT_BODY, media_type="application/json")
+    else:
+        raise upstream_error(response, "Logout failed")
 
 # Legacy endpoint for backward compatibility
-@app.post("/login", response_model=LoginResponse)
-async def legacy_login(request: LoginRequest):
+@app.post("/login", responses={200: {"model": LoginResponse}})
+async def legacy_login(request: LoginRequest, client: httpx.AsyncClient = Depends(get_client)):
     """Legacy login endpoint - redirects to new auth flow"""
-    return await login(request)
+    return await login(request, client)
 
 # =============================================================================
 # TRIPS API ROUTES - Proxy to Database API
 # =============================================================================
 
 @app.post("/api/trips")
-async def create_trip(request: TripCreateRequest, current_user: dict = Depends(get_current_user)):
+async def create_trip(request: TripCreateRequest, current_user: dict = Depends(get_current_user), headers: dict = Depends(get_user_headers), client: httpx.AsyncClient = Depends(get_client), redis_client=Depends(get_redis)):
     """Create a new trip via Database API"""
     
-    # Extract user ID, email, and role from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
-    user_role = current_user.get('role', 'user')
-    
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{DATABASE_API_URL}/api/trips",
-                json=request.dict(),
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email,
-                    "x-user-role": user_role
-                }
-            )
-            
-            if response.status_code == 201:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to create trip"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to create trip")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "POST",
+        TRIPS_URL,
+        timeout=DB_WRITE_TIMEOUT,
+        content=request.model_dump_json(exclude_none=True),
+        headers=headers
+    )
+    response = await relay_stream(client, upstream_request, 201, "Failed to create trip")
+    await cache_invalidate(redis_client, cache_prefix("trips", current_user))
+    return response
 
 @app.get("/api/trips")
 async def get_trips(
@@ -425,156 +1118,90 @@ async def get_trips(
     limit: int = 10,
     status: str = None,
     search: str = None,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    headers: dict = Depends(get_user_headers),
+    client: httpx.AsyncClient = Depends(get_client),
+    redis_client=Depends(get_read_cache)
 ):
     """Get all trips via Database API"""
     
-    # Extract user ID, email, and role from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
-    user_role = current_user.get('role', 'user')
-    
     params = {"page": page, "limit": limit}
     if status:
         params["status"] = status
     if search:
         params["search"] = search
     
-    async with get_http_client() as client:
-        try:
-            response = await client.get(
-                f"{DATABASE_API_URL}/api/trips",
-                params=params,
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email,
-                    "x-user-role": user_role
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to fetch trips"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to fetch trips")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "GET",
+        TRIPS_URL,
+        timeout=DB_TIMEOUT,
+        params=params,
+        headers=headers
+    )
+    cache_key = cache_prefix("trips", current_user) + f"list:{page}:{limit}:{status}:{search}"
+    return await relay_cached(redis_client, client, cache_key, TRIPS_LIST_CACHE_TTL, upstream_request, 200, "Failed to fetch trips")
 
 @app.get("/api/trips/{trip_id}")
-async def get_trip(trip_id: str, current_user: dict = Depends(get_current_user)):
+async def get_trip(trip_id: str, current_user: dict = Depends(get_current_user), headers: dict = Depends(get_user_headers), client: httpx.AsyncClient = Depends(get_client), redis_client=Depends(get_read_cache)):
     """Get single trip by ID via Database API"""
     
-    async with get_http_client() as client:
-        try:
-            response = await client.get(
-                f"{DATABASE_API_URL}/api/trips/{trip_id}",
-                headers={"Authorization": f"Bearer {current_user.get('accessToken', '')}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to fetch trip"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to fetch trip")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "GET",
+        f"{TRIPS_URL}/{trip_id}",
+        timeout=DB_TIMEOUT,
+        headers=headers
+    )
+    cache_key = cache_prefix("trips", current_user) + trip_id
+    return await relay_cached(redis_client, client, cache_key, TRIP_CACHE_TTL, upstream_request, 200, "Failed to fetch trip")
 
 @app.put("/api/trips/{trip_id}")
-async def update_trip(trip_id: str, request: TripUpdateRequest, current_user: dict = Depends(get_current_user)):
+async def update_trip(trip_id: str, request: TripUpdateRequest, current_user: dict = Depends(get_current_user), headers: dict = Depends(get_user_headers), client: httpx.AsyncClient = Depends(get_client), redis_client=Depends(get_redis)):
     """Update trip via Database API"""
     
-    async with get_http_client() as client:
-        try:
-            response = await client.put(
-                f"{DATABASE_API_URL}/api/trips/{trip_id}",
-                json=request.dict(exclude_unset=True),
-                headers={"Authorization": f"Bearer {current_user.get('accessToken', '')}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to update trip"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to update trip")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "PUT",
+        f"{TRIPS_URL}/{trip_id}",
+        timeout=DB_TIMEOUT,
+        content=request.model_dump_json(exclude_unset=True),
+        headers=headers
+    )
+    response = await relay_stream(client, upstream_request, 200, "Failed to update trip")
+    await cache_invalidate(redis_client, cache_prefix("trips", current_user))
+    return response
 
 @app.delete("/api/trips/{trip_id}")
-async def delete_trip(trip_id: str, current_user: dict = Depends(get_current_user)):
+async def delete_trip(trip_id: str, current_user: dict = Depends(get_current_user), headers: dict = Depends(get_user_headers), client: httpx.AsyncClient = Depends(get_client), redis_client=Depends(get_redis)):
     """Delete trip via Database API"""
     
-    async with get_http_client() as client:
-        try:
-            response = await client.delete(
-                f"{DATABASE_API_URL}/api/trips/{trip_id}",
-                headers={"Authorization": f"Bearer {current_user.get('accessToken', '')}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to delete trip"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to delete trip")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "DELETE",
+        f"{TRIPS_URL}/{trip_id}",
+        timeout=DB_TIMEOUT,
+        headers=headers
+    )
+    response = await relay_stream(client, upstream_request, 200, "Failed to delete trip")
+    await cache_invalidate(redis_client, cache_prefix("trips", current_user))
+    return response
 
 # =============================================================================
 # INVOICES API ROUTES - Proxy to Database API
 # =============================================================================
 
 @app.post("/api/invoices")
-async def create_invoice(request: InvoiceCreateRequest, current_user: dict = Depends(get_current_user)):
+async def create_invoice(request: InvoiceCreateRequest, current_user: dict = Depends(get_current_user), call=Depends(db_caller), redis_client=Depends(get_redis)):
     """Create a new invoice via Database API"""
     
-    # Extract user ID and email from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
+    response = await call(
+        "POST",
+        INVOICES_URL,
+        content=request.model_dump_json(exclude_none=True)
+    )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{DATABASE_API_URL}/api/invoices",
-                json=request.dict(),
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email
-                }
-            )
-            
-            if response.status_code == 201:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to create invoice"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to create invoice")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    if response.status_code == 201:
+        await cache_invalidate(redis_client, cache_prefix("invoices", current_user))
+        return relay_body(response)
+    else:
+        raise upstream_error(response, "Failed to create invoice")
 
 @app.get("/api/invoices")
 async def get_invoices(
@@ -583,15 +1210,13 @@ async def get_invoices(
     documentStatus: str = None,
     tripId: str = None,
     search: str = None,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    headers: dict = Depends(get_user_headers),
+    client: httpx.AsyncClient = Depends(get_client),
+    redis_client=Depends(get_read_cache)
 ):
     """Get all invoices via Database API"""
     
-    # Extract user ID, email, and role from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
-    user_role = current_user.get('role', 'user')
-    
     params = {"page": page, "limit": limit}
     if documentStatus:
         params["documentStatus"] = documentStatus
@@ -600,238 +1225,121 @@ async def get_invoices(
     if search:
         params["search"] = search
     
-    async with get_http_client() as client:
-        try:
-            response = await client.get(
-                f"{DATABASE_API_URL}/api/invoices",
-                params=params,
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email,
-                    "x-user-role": user_role
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to fetch invoices"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to fetch invoices")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "GET",
+        INVOICES_URL,
+        timeout=DB_TIMEOUT,
+        params=params,
+        headers=headers
+    )
+    cache_key = cache_prefix("invoices", current_user) + f"list:{page}:{limit}:{documentStatus}:{tripId}:{search}"
+    return await relay_cached(redis_client, client, cache_key, INVOICES_CACHE_TTL, upstream_request, 200, "Failed to fetch invoices")
 
 @app.get("/api/invoices/{invoice_id}")
-async def get_invoice(invoice_id: str, current_user: dict = Depends(get_current_user)):
+async def get_invoice(invoice_id: str, current_user: dict = Depends(get_current_user), headers: dict = Depends(get_user_headers), client: httpx.AsyncClient = Depends(get_client), redis_client=Depends(get_read_cache)):
     """Get single invoice by ID via Database API"""
     
-    # Extract user ID and email from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
-    
-    async with get_http_client() as client:
-        try:
-            response = await client.get(
-                f"{DATABASE_API_URL}/api/invoices/{invoice_id}",
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to fetch invoice"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to fetch invoice")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "GET",
+        f"{INVOICES_URL}/{invoice_id}",
+        timeout=DB_TIMEOUT,
+        headers=headers
+    )
+    cache_key = cache_prefix("invoices", current_user) + invoice_id
+    return await relay_cached(redis_client, client, cache_key, INVOICES_CACHE_TTL, upstream_request, 200, "Failed to fetch invoice")
 
 @app.put("/api/invoices/{invoice_id}")
-async def update_invoice(invoice_id: str, request: InvoiceUpdateRequest, current_user: dict = Depends(get_current_user)):
+async def update_invoice(invoice_id: str, request: InvoiceUpdateRequest, current_user: dict = Depends(get_current_user), call=Depends(db_caller), redis_client=Depends(get_redis)):
     """Update invoice via Database API"""
     
-    # Extract user ID and email from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
+    response = await call(
+        "PUT",
+        f"{INVOICES_URL}/{invoice_id}",
+        content=request.model_dump_json(exclude_unset=True)
+    )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.put(
-                f"{DATABASE_API_URL}/api/invoices/{invoice_id}",
-                json=request.dict(exclude_unset=True),
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to update invoice"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to update invoice")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    if response.status_code == 200:
+        await cache_invalidate(redis_client, cache_prefix("invoices", current_user))
+        return relay_body(response)
+    else:
+        raise upstream_error(response, "Failed to update invoice")
 
 @app.post("/api/invoices/{invoice_id}/process")
-async def start_invoice_processing(invoice_id: str, current_user: dict = Depends(get_current_user)):
+async def start_invoice_processing(invoice_id: str, current_user: dict = Depends(get_current_user), call=Depends(db_caller), redis_client=Depends(get_redis)):
     """Start invoice processing via Database API"""
     
-    # Extract user ID and email from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
+    response = await call(
+        "POST",
+        f"{INVOICES_URL}/{invoice_id}/process"
+    )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{DATABASE_API_URL}/api/invoices/{invoice_id}/process",
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to start invoice processing"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to start invoice processing")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    if response.status_code == 200:
+        await cache_invalidate(redis_client, cache_prefix("invoices", current_user))
+        return relay_body(response)
+    else:
+        raise upstream_error(response, "Failed to start invoice processing")
 
 @app.post("/api/invoices/{invoice_id}/complete-processing")
 async def complete_invoice_processing(
     invoice_id: str, 
     request: dict = Body(...),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    call=Depends(db_caller),
+    redis_client=Depends(get_redis)
 ):
     """Complete invoice processing via Database API"""
     
-    # Extract user ID and email from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
+    response = await call(
+        "POST",
+        f"{INVOICES_URL}/{invoice_id}/complete-processing",
+        content=orjson.dumps(request)
+    )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{DATABASE_API_URL}/api/invoices/{invoice_id}/complete-processing",
-                json=request,
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to complete invoice processing"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to complete invoice processing")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    if response.status_code == 200:
+        await cache_invalidate(redis_client, cache_prefix("invoices", current_user))
+        return relay_body(response)
+    else:
+        raise upstream_error(response, "Failed to complete invoice processing")
 
 @app.post("/api/invoices/{invoice_id}/fail-processing")
 async def fail_invoice_processing(
     invoice_id: str,
     request: dict = Body(...),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    call=Depends(db_caller),
+    redis_client=Depends(get_redis)
 ):
     """Mark invoice processing as failed via Database API"""
     
-    # Extract user ID and email from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
+    response = await call(
+        "POST",
+        f"{INVOICES_URL}/{invoice_id}/fail-processing",
+        content=orjson.dumps(request)
+    )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{DATABASE_API_URL}/api/invoices/{invoice_id}/fail-processing",
-                json=request,
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to mark invoice processing as failed"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to mark invoice processing as failed")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    if response.status_code == 200:
+        await cache_invalidate(redis_client, cache_prefix("invoices", current_user))
+        return relay_body(response)
+    else:
+        raise upstream_error(response, "Failed to mark invoice processing as failed")
 
 @app.post("/api/invoices/validate")
 async def validate_invoice(
     request: dict = Body(...),
-    current_user: dict = Depends(get_current_user)
+    call=Depends(db_caller)
 ):
     """Validate invoice data via Database API"""
     
-    # Extract user ID and email from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
+    response = await call(
+        "POST",
+        f"{INVOICES_URL}/validate",
+        content=orjson.dumps(request)
+    )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{DATABASE_API_URL}/api/invoices/validate",
-                json=request,
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to validate invoice data"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to validate invoice data")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    if response.status_code == 200:
+        return relay_body(response)
+    else:
+        raise upstream_error(response, "Failed to validate invoice data")
 
 # =============================================================================
 # USERS API ROUTES - Proxy to Database API
@@ -844,15 +1352,13 @@ async def get_users(
     search: str = None,
     role: str = None,
     status: str = None,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    headers: dict = Depends(get_user_headers),
+    client: httpx.AsyncClient = Depends(get_client),
+    redis_client=Depends(get_read_cache)
 ):
     """Get all users via Database API"""
     
-    # Extract user ID, email, and role from current_user
-    user_id = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
-    user_role = current_user.get('role', 'user')
-    
     params = {"page": page, "limit": limit}
     if search:
         params["search"] = search
@@ -861,191 +1367,216 @@ async def get_users(
     if status:
         params["status"] = status
     
-    async with get_http_client() as client:
-        try:
-            response = await client.get(
-                f"{DATABASE_API_URL}/api/users",
-                params=params,
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id) if user_id else "",
-                    "x-user-email": user_email,
-                    "x-user-role": user_role
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to fetch users"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to fetch users")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "GET",
+        USERS_URL,
+        timeout=DB_TIMEOUT,
+        params=params,
+        headers=headers
+    )
+    cache_key = cache_prefix("users", current_user) + f"list:{page}:{limit}:{search}:{role}:{status}"
+    return await relay_cached(redis_client, client, cache_key, USERS_CACHE_TTL, upstream_request, 200, "Failed to fetch users")
 
 @app.get("/api/users/{user_id}")
-async def get_user(user_id: str, current_user: dict = Depends(get_current_user)):
+async def get_user(user_id: str, current_user: dict = Depends(get_current_user), headers: dict = Depends(get_user_headers), client: httpx.AsyncClient = Depends(get_client), redis_client=Depends(get_read_cache)):
     """Get single user by ID via Database API"""
     
-    async with get_http_client() as client:
-        try:
-            response = await client.get(
-                f"{DATABASE_API_URL}/api/users/{user_id}",
-                headers={"Authorization": f"Bearer {current_user.get('accessToken', '')}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to fetch user"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to fetch user")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "GET",
+        f"{USERS_URL}/{user_id}",
+        timeout=DB_TIMEOUT,
+        headers=headers
+    )
+    cache_key = cache_prefix("users", current_user) + user_id
+    return await relay_cached(redis_client, client, cache_key, USERS_CACHE_TTL, upstream_request, 200, "Failed to fetch user")
 
 @app.put("/api/users/{user_id}")
 async def update_user(
     user_id: str,
     request: dict = Body(...),
-    current_user: dict = Depends(get_current_user)
+    call=Depends(db_caller),
+    redis_client=Depends(get_redis)
 ):
     """Update user via Database API"""
     
-    # Extract user ID, email, and role from current_user
-    user_id_header = current_user.get('_id') or current_user.get('id')
-    user_email = current_user.get('email', '')
-    user_role = current_user.get('role', 'user')
+    response = await call(
+        "PUT",
+        f"{USERS_URL}/{user_id}",
+        content=orjson.dumps(request)
+    )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.put(
-                f"{DATABASE_API_URL}/api/users/{user_id}",
-                json=request,
-                headers={
-                    "Authorization": f"Bearer {current_user.get('accessToken', '')}",
-                    "x-user-id": str(user_id_header) if user_id_header else "",
-                    "x-user-email": user_email,
-                    "x-user-role": user_role
-                }
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to update user"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to update user")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    if response.status_code == 200:
+        # Every requester's cached copy of this user is now out of date, not just our own
+        await cache_invalidate(redis_client, f"{CACHE_PREFIX}:users:")
+        return relay_body(response)
+    else:
+        raise upstream_error(response, "Failed to update user")
 
 @app.patch("/api/users/{user_id}/password")
 async def change_password(
     user_id: str,
     request: dict = Body(...),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    call=Depends(db_caller)
 ):
     """Change user password via Database API (requires current password verification)"""
     
-    # Extract user ID and email from current_user
-    current_user_id = current_user.get('_id') or current_user.get('id')
-    
     # Only allow users to change their own password (unless admin)
-    if str(current_user_id) != user_id and current_user.get('role') != 'admin':
+    if current_user["_user_id_str"] != user_id and current_user.get('role') != 'admin':
         raise HTTPException(
             status_code=403,
             detail="You can only change your own password"
         )
     
-    async with get_http_client() as client:
-        try:
-            response = await client.patch(
-                f"{DATABASE_API_URL}/api/users/{user_id}/password",
-                json=request,
-                headers={"Authorization": f"Bearer {current_user.get('accessToken', '')}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to change password"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to change password")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Database service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Database service unavailable: {str(e)}")
+    response = await call(
+        "PATCH",
+        f"{USERS_URL}/{user_id}/password",
+        content=orjson.dumps(request)
+    )
+    
+    if response.status_code == 200:
+        return relay_body(response)
+    else:
+        raise upstream_error(response, "Failed to change password")
 
 # =============================================================================
 # STORAGE API ROUTES - Proxy to Storage API
 # =============================================================================
 
 @app.post("/api/storage/upload")
-async def upload_file(current_user: dict = Depends(get_current_user)):
-    """Upload file via Storage API"""
+async def upload_file(request: Request, current_user: dict = Depends(get_current_user), client: httpx.AsyncClient = Depends(get_client), redis_client=Depends(get_redis)):
+    """Upload file via Storage API
     
-    async with get_http_client() as client:
-        try:
-            response = await client.post(
-                f"{STORAGE_API_URL}/upload",
-                headers={"Authorization": f"Bearer {current_user.get('accessToken', '')}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to upload file"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to upload file")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Storage service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Storage service unavailable: {str(e)}")
+    The multipart body is streamed through as it arrives (boundary and all), so the
+    file is never held in memory here.
+    """
+    
+    headers = {
+        "Authorization": f"Bearer {current_user.get('accessToken', '')}",
+        "Content-Type": request.headers.get("content-type", "")
+    }
+    if "content-length" in request.headers:
+        headers["Content-Length"] = request.headers["content-length"]
+    upstream_request = client.build_request(
+        "POST",
+        STORAGE_UPLOAD_URL,
+        timeout=STORAGE_TIMEOUT,
+        content=request.stream(),
+        headers=headers
+    )
+    response = await relay_stream(client, upstream_request, 200, "Failed to upload file")
+    await cache_invalidate(redis_client, cache_prefix("files", current_user))
+    return response
 
 @app.get("/api/storage/files")
-async def get_files(current_user: dict = Depends(get_current_user)):
+async def get_files(current_user: dict = Depends(get_current_user), client: httpx.AsyncClient = Depends(get_client), redis_client=Depends(get_read_cache)):
     """Get all files via Storage API"""
     
-    async with get_http_client() as client:
-        try:
-            response = await client.get(
-                f"{STORAGE_API_URL}/files",
-                headers={"Authorization": f"Bearer {current_user.get('accessToken', '')}"}
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"message": "Failed to fetch files"}
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_data.get("message", "Failed to fetch files")
-                )
-        except httpx.TimeoutException:
-            raise HTTPException(status_code=504, detail="Storage service timeout")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail=f"Storage service unavailable: {str(e)}")
+    upstream_request = client.build_request(
+        "GET",
+        STORAGE_FILES_URL,
+        timeout=STORAGE_TIMEOUT,
+        headers={"Authorization": f"Bearer {current_user.get('accessToken', '')}"}
+    )
+    cache_key = cache_prefix("files", current_user) + "list"
+    return await relay_cached(redis_client, client, cache_key, FILES_CACHE_TTL, upstream_request, 200, "Failed to fetch files")
 
-# Legacy endpoint for backward compatibility
-@app.post("/login", response_model=LoginResponse)
-async def legacy_login(request: LoginRequest):
-    """Legacy login endpoint - redirects to new auth flow"""
-    return await login(request)
+# =============================================================================
+# DASHBOARD API ROUTES - Several Database API reads in one round trip
+# =============================================================================
+
+@app.get("/api/dashboard")
+async def get_dashboard(
+    limit: int = 5,
+    current_user: dict = Depends(get_current_user),
+    call=Depends(db_caller)
+):
+    """Get the user's recent trips and invoices in one response
+    
+    Both Database API calls are issued concurrently, so the page costs the slower
+    of the two round trips instead of both plus a second token verification.
+    """
+    
+    params = {"page": 1, "limit": limit}
+    
+    results = await fan_out(
+        call("GET", TRIPS_URL, params=params),
+        call("GET", INVOICES_URL, params=params)
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    trips_response, invoices_response = results
+    
+    if trips_response.status_code != 200:
+        raise upstream_error(trips_response, "Failed to fetch trips")
+    if invoices_response.status_code != 200:
+        raise upstream_error(invoices_response, "Failed to fetch invoices")
+    
+    user = {key: value for key, value in current_user.items() if key not in ("accessToken", "_user_id_str", "_headers")}
+    # Fragments splice the upstream bodies in as-is instead of parsing and re-encoding them
+    return ORJSONResponse({
+        "success": True,
+        "data": {
+            "user": user,
+            "trips": orjson.Fragment(trips_response.content),
+            "invoices": orjson.Fragment(invoices_response.content)
+        }
+    })
+
+# =============================================================================
+# BATCH API ROUTES - Run several orchestrator requests in one round trip
+# =============================================================================
+
+async def run_batch_item(dispatcher: httpx.AsyncClient, item: BatchItem, headers: dict) -> dict:
+    """Execute one batch sub-request against this app and capture its status and body"""
+    if not item.path.startswith("/") or item.path.startswith("/batch"):
+        return {"status": 400, "body": {"detail": f"Invalid batch path: {item.path}"}}
+    
+    response = await dispatcher.request(item.method.upper(), item.path, json=item.body, headers=headers)
+    if response.headers.get("content-type", "").startswith("application/json"):
+        body = orjson.Fragment(response.content)
+    else:
+        body = response.text
+    return {"status": response.status_code, "body": body}
+
+@app.post("/batch")
+async def batch(
+    items: List[BatchItem],
+    request: Request,
+    authorization: Optional[str] = Header(None)
+):
+    """Run up to MAX_BATCH_ITEMS requests concurrently and return their results in order
+    
+    Sub-requests go through the regular routes (same auth checks and upstream headers),
+    so one failing item is reported in its own slot without cancelling the others.
+    """
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch cannot contain more than {MAX_BATCH_ITEMS} requests"
+        )
+    
+    headers = {"Authorization": authorization} if authorization else {}
+    dispatcher = request.app.state.batch_client
+    results = await fan_out(*[run_batch_item(dispatcher, item, headers) for item in items])
+    # Returned directly: the bodies are orjson Fragments, which jsonable_encoder can't walk
+    return ORJSONResponse([
+        {"status": 502, "body": {"detail": f"Batch request failed: {str(result)}"}}
+        if isinstance(result, Exception) else result
+        for result in results
+    ])
 
 if __name__ == "__main__":
-    uvicorn.run(app, host=API_HOST, port=API_PORT)
+    # Multiple workers need an import string; "main:app" resolves because this
+    # file's directory is on sys.path when it is run as a script
+    uvicorn.run(
+        "main:app",
+        host=CONFIG.api_host,
+        port=CONFIG.api_port,
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 2)),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False
+    )
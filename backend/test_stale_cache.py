@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for the stale response cache fallback in relay_cached.
+
+Needs a Redis server at REDIS_URL (default redis://localhost:6379); no upstream
+services are called - the Database API is replaced by a mock transport.
+"""
+
+import asyncio
+import os
+import httpx
+from redis import asyncio as aioredis
+
+from app.main import (
+    CONFIG,
+    BreakerTransport,
+    CircuitBreaker,
+    cache_write,
+    relay_cached,
+)
+
+# Configuration
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+CACHE_KEY = "trip-opt:test:stale-cache"
+STALE_WARNING = '110 - "Response is Stale"'
+
+async def seed_cache(redis_client, url):
+    """Cache a successful upstream answer for CACHE_KEY"""
+    response = httpx.Response(200, json={"success": True, "data": []}, request=httpx.Request("GET", url))
+    await cache_write(redis_client, CACHE_KEY, response)
+
+async def check_stale(redis_client, name, breaker, upstream_status):
+    """relay_cached should answer 200 with Warning: 110 from the stale entry"""
+    upstream_calls = []
+
+    def upstream(request):
+        upstream_calls.append(request)
+        return httpx.Response(upstream_status)
+
+    url = f"{CONFIG.db_api_url}/api/trips"
+    transport = BreakerTransport(httpx.MockTransport(upstream), {"Database": breaker})
+    async with httpx.AsyncClient(transport=transport) as client:
+        await seed_cache(redis_client, url)
+        # ttl=0 makes the seeded entry stale straight away
+        response = await relay_cached(
+            redis_client, client, CACHE_KEY, 0, client.build_request("GET", url), 200, "Failed to fetch trips"
+        )
+
+    print(f"\n🧪 {name}")
+    print(f"Status: {response.status_code}, Warning: {response.headers.get('warning')}, upstream calls: {len(upstream_calls)}")
+    assert response.status_code == 200
+    assert response.headers.get("warning") == STALE_WARNING
+    print("✅ Stale entry served")
+    return upstream_calls
+
+async def main():
+    redis_client = aioredis.from_url(REDIS_URL)
+    try:
+        # Circuit already open: the upstream must not be called at all
+        open_breaker = CircuitBreaker("Database", threshold=1, ttl=60)
+        open_breaker.record_failure()
+        calls = await check_stale(redis_client, "Open circuit", open_breaker, 200)
+        assert not calls
+
+        # Circuit closed, but the upstream answers 503
+        await check_stale(redis_client, "Upstream 503", CircuitBreaker("Database", threshold=5, ttl=60), 503)
+    finally:
+        await redis_client.delete(CACHE_KEY)
+        await redis_client.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,10 +3,10 @@ Configuration management for the Storage API.
 """
 
 import os
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from pydantic import BaseModel, validator
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import FrozenSet, List, Optional
 
 
 class Settings(BaseSettings):
@@ -18,6 +18,8 @@ class Settings(BaseSettings):
     debug: bool = False
     host: str = "0.0.0.0"
     port: int = 8001
+    # cpu_count() reports the host's cores, not a container's CPU quota
+    workers: int = min(max(2, os.cpu_count() or 1), 4)
     
     # AWS S3 Configuration
     aws_access_key_id: str
@@ -31,6 +33,9 @@ class Settings(BaseSettings):
     max_file_size_mb: int = 100
     allowed_file_types: str = "image/jpeg,image/png,image/gif,application/pdf,text/plain"
     upload_path: str = "uploads/"
+    max_concurrent_uploads: int = 8
+    # Unset: /single proxies anything up to max_file_size_mb
+    proxy_upload_max_mb: Optional[int] = None
     
     # CORS Settings
     cors_origins: str = "*"
@@ -67,6 +72,24 @@ class Settings(BaseSettings):
             raise ValueError('Max file size cannot exceed 1000 MB')
         return v
     
+    @validator('workers')
+    def validate_workers(cls, v):
+        if v <= 0:
+            raise ValueError('Workers must be greater than 0')
+        return v
+    
+    @validator('max_concurrent_uploads')
+    def validate_max_concurrent_uploads(cls, v):
+        if v <= 0:
+            raise ValueError('Max concurrent uploads must be greater than 0')
+        return v
+    
+    @validator('proxy_upload_max_mb')
+    def validate_proxy_upload_max_mb(cls, v):
+        if v is not None and v <= 0:
+            raise ValueError('Proxy upload size limit must be greater than 0')
+        return v
+    
     @validator('allowed_file_types')
     def validate_allowed_file_types(cls, v):
         if not v:
@@ -91,6 +114,11 @@ class Settings(BaseSettings):
             return '*'
         return v
     
+    @cached_property
+    def allowed_file_types_set(self) -> FrozenSet[str]:
+        """Get allowed MIME types as a set, parsed once per settings instance."""
+        return frozenset(t.strip().lower() for t in self.allowed_file_types.split(','))
+    
     @property
     def cors_origins_list(self) -> List[str]:
         """Get CORS origins as a list."""
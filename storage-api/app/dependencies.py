@@ -0,0 +1,39 @@
+"""
+Shared FastAPI dependencies for the Storage API.
+"""
+
+from fastapi import Query, Request
+
+from .config import Settings
+from .services import S3Service
+from .utils import DateFormat
+
+
+def create_storage_service(settings: Settings) -> S3Service:
+    """Build the storage service from application settings."""
+    return S3Service(
+        aws_access_key_id=settings.aws_access_key_id,
+        aws_secret_access_key=settings.aws_secret_access_key,
+        region_name=settings.aws_region,
+        bucket_name=settings.s3_bucket_name,
+        upload_path=settings.upload_path,
+        aws_session_token=settings.aws_session_token,
+        # Each worker process has its own caches, and a delete handled by one
+        # worker can't invalidate another's, so only cache with a single process
+        cache_results=settings.debug or settings.workers == 1
+    )
+
+
+async def get_storage_service(request: Request) -> S3Service:
+    """Dependency to get the process-wide storage service created at startup."""
+    return request.app.state.s3_service
+
+
+async def get_date_format(
+    date_format: DateFormat = Query(
+        "iso",
+        description="Timestamp format: ISO 8601 strings (iso) or integer epoch seconds (epoch)"
+    )
+) -> DateFormat:
+    """Dependency to read the requested timestamp format."""
+    return date_format
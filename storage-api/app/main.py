@@ -7,14 +7,16 @@ import sys
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 
 from .config import get_settings
+from .dependencies import create_storage_service
 from .routes import upload_router, health_router
 from .utils.exceptions import StorageAPIException
+from .utils.orjson_response import ORJSONResponse
 from .models.response_models import ErrorResponse
 
 
@@ -44,14 +46,15 @@ async def lifespan(app: FastAPI):
     logger = logging.getLogger(__name__)
     logger.info("Storage API starting up...")
     
-    # Initialize any startup tasks here
-    # For example, test database connections, initialize Redis, etc.
+    # One storage service (and S3 client) per process, shared by all requests
+    app.state.s3_service = create_storage_service(get_settings())
+    await app.state.s3_service.connect()
     
     yield
     
     # Shutdown
     logger.info("Storage API shutting down...")
-    # Cleanup tasks here
+    await app.state.s3_service.close()
 
 
 # Create FastAPI application
@@ -66,6 +69,7 @@ def create_app() -> FastAPI:
         docs_url="/docs" if settings.debug else None,
         redoc_url="/redoc" if settings.debug else None,
         openapi_url="/openapi.json" if settings.debug else None,
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
     
@@ -78,6 +82,10 @@ def create_app() -> FastAPI:
         allow_headers=settings.cors_headers_list,
     )
     
+    # Compress JSON bodies; file listings repeat the same bucket URL prefix
+    # on every entry and shrink several-fold
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    
     # Add trusted host middleware for production
     if not settings.debug:
         app.add_middleware(
@@ -89,24 +97,25 @@ def create_app() -> FastAPI:
     @app.exception_handler(StorageAPIException)
     async def storage_api_exception_handler(request: Request, exc: StorageAPIException):
         """Handle custom Storage API exceptions."""
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=400,
-            content=ErrorResponse(
+            content=ErrorResponse.model_construct(
                 message=exc.message,
                 error_code=exc.error_code,
                 details=exc.details
-            ).dict()
+            )
         )
     
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, exc: HTTPException):
         """Handle HTTP exceptions."""
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
-            content=ErrorResponse(
+            content=ErrorResponse.model_construct(
                 message=exc.detail,
                 error_code=f"HTTP_{exc.status_code}"
-            ).dict()
+            ),
+            headers=exc.headers
         )
     
     @app.exception_handler(Exception)
@@ -115,12 +124,12 @@ def create_app() -> FastAPI:
         logger = logging.getLogger(__name__)
         logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
         
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
-            content=ErrorResponse(
+            content=ErrorResponse.model_construct(
                 message="Internal server error",
                 error_code="INTERNAL_SERVER_ERROR"
-            ).dict()
+            )
         )
     
     # Include routers
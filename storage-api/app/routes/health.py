@@ -6,27 +6,16 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException
 from ..models import HealthResponse, StorageHealthResponse, APIResponse
 from ..services import S3Service
+from ..dependencies import get_storage_service, get_date_format
 from ..config import get_settings
+from ..utils import ORJSONResponse, DateFormat, api_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/health", tags=["health"])
 
 
-async def get_storage_service() -> S3Service:
-    """Dependency to get storage service instance."""
-    settings = get_settings()
-    return S3Service(
-        aws_access_key_id=settings.aws_access_key_id,
-        aws_secret_access_key=settings.aws_secret_access_key,
-        region_name=settings.aws_region,
-        bucket_name=settings.s3_bucket_name,
-        upload_path=settings.upload_path,
-        aws_session_token=settings.aws_session_token
-    )
-
-
-@router.get("", response_model=HealthResponse)
+@router.get("", responses={200: {"model": HealthResponse}})
 async def health_check():
     """
     Basic health check endpoint.
@@ -37,25 +26,27 @@ async def health_check():
     try:
         settings = get_settings()
         
-        return HealthResponse(
+        return ORJSONResponse(HealthResponse.model_construct(
             status="healthy",
             version=settings.app_version
-        )
+        ))
         
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+        logger.error("Health check failed: %s", e)
         raise HTTPException(status_code=503, detail="Service unhealthy")
 
 
-@router.get("/storage", response_model=APIResponse[StorageHealthResponse])
+@router.get("/storage", responses={200: {"model": APIResponse[StorageHealthResponse]}})
 async def storage_health_check(
-    storage_service: S3Service = Depends(get_storage_service)
+    storage_service: S3Service = Depends(get_storage_service),
+    date_format: DateFormat = Depends(get_date_format)
 ):
     """
     Storage service health check endpoint.
     
     Args:
         storage_service: Storage service instance
+        date_format: Timestamp format for the response
         
     Returns:
         APIResponse with storage health details
@@ -64,45 +55,43 @@ async def storage_health_check(
         # Perform storage health check
         health_data = await storage_service.health_check()
         
-        # Create response based on health check results
+        # Create response based on health check results (our own values - no validation needed)
         if health_data["status"] == "healthy":
-            response_data = StorageHealthResponse(
+            response_data = StorageHealthResponse.model_construct(
                 status="healthy",
                 storage_provider=health_data["provider"],
                 bucket_accessible=health_data["bucket_accessible"]
             )
             
-            return APIResponse(
-                success=True,
-                message="Storage service is healthy",
-                data=response_data
-            )
+            return api_response("Storage service is healthy", response_data, date_format=date_format)
         else:
             # Storage service is unhealthy
-            response_data = StorageHealthResponse(
+            response_data = StorageHealthResponse.model_construct(
                 status="unhealthy",
                 storage_provider=health_data["provider"],
                 bucket_accessible=health_data["bucket_accessible"]
             )
             
-            return APIResponse(
+            return api_response(
+                f"Storage service is unhealthy: {health_data.get('error', 'Unknown error')}",
+                response_data,
                 success=False,
-                message=f"Storage service is unhealthy: {health_data.get('error', 'Unknown error')}",
-                data=response_data
+                date_format=date_format
             )
             
     except Exception as e:
-        logger.error(f"Storage health check failed: {str(e)}")
+        logger.error("Storage health check failed: %s", e)
         
         # Return unhealthy status
-        response_data = StorageHealthResponse(
+        response_data = StorageHealthResponse.model_construct(
             status="unhealthy",
             storage_provider="unknown",
             bucket_accessible=False
         )
         
-        return APIResponse(
+        return api_response(
+            f"Storage health check failed: {str(e)}",
+            response_data,
             success=False,
-            message=f"Storage health check failed: {str(e)}",
-            data=response_data
+            date_format=date_format
         )
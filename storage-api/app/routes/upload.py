@@ -2,9 +2,15 @@
 Upload API routes for the Storage API.
 """
 
+import asyncio
 import logging
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+import os
+import re
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from ..models import (
     FileUploadResponse, 
     MultipleFileUploadResponse, 
@@ -15,18 +21,29 @@ from ..models import (
 )
 from ..services import S3Service
 from ..utils import (
-    validate_file_type, 
-    validate_file_size, 
     validate_filename,
+    FileValidator,
+    get_file_validator,
+    SNIFF_BYTES,
     FileValidationError,
-    StorageServiceError
+    StorageServiceError,
+    DateFormat,
+    api_response,
+    dump_json
 )
+from ..dependencies import get_storage_service, get_date_format
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/upload", tags=["upload"])
 
+# Upper bound on max_keys for /list/stream, which pages through S3 lazily
+STREAM_MAX_KEYS = 10000
+
+# Canonical hyphenated form, the only one this service hands out as a file ID
+_UUID_RE = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
 
 async def get_current_user():
     """Dependency to get current user (no authentication for testing)."""
@@ -39,83 +56,146 @@ async def get_current_user():
     }
 
 
-async def get_storage_service() -> S3Service:
-    """Dependency to get storage service instance."""
-    settings = get_settings()
-    return S3Service(
-        aws_access_key_id=settings.aws_access_key_id,
-        aws_secret_access_key=settings.aws_secret_access_key,
-        region_name=settings.aws_region,
-        bucket_name=settings.s3_bucket_name,
-        upload_path=settings.upload_path,
-        aws_session_token=settings.aws_session_token
-    )
-
-
-@router.post("/single", response_model=APIResponse[FileUploadResponse])
+@router.post("/single", responses={200: {"model": APIResponse[FileUploadResponse]}})
 async def upload_single_file(
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user),
-    storage_service: S3Service = Depends(get_storage_service)
+    storage_service: S3Service = Depends(get_storage_service),
+    date_format: DateFormat = Depends(get_date_format)
 ):
     """
     Upload a single file to storage.
     
+    If PROXY_UPLOAD_MAX_MB is set, only files up to that size are proxied;
+    larger ones are answered with 413 and a Location header pointing at
+    /presigned-upload, so the client sends the bytes straight to S3.
+    
     Args:
         file: The file to upload
         current_user: Current authenticated user
         storage_service: Storage service instance
+        date_format: Timestamp format for the response
         
     Returns:
         APIResponse with file upload details
     """
     try:
         settings = get_settings()
+        validator = get_file_validator(settings.allowed_file_types_set, settings.max_file_size_mb)
+        file_size = _upload_size(file)
         
-        # Read file content
-        file_content = await file.read()
+        # Large files should bypass this service and go to S3 via a presigned POST
+        if settings.proxy_upload_max_mb is not None and file_size > settings.proxy_upload_max_mb * 1024 * 1024:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Files over {settings.proxy_upload_max_mb} MB must be uploaded with a presigned upload URL",
+                headers={"Location": router.url_path_for("get_presigned_upload_url")}
+            )
         
-        # Validate filename
-        validated_filename = validate_filename(file.filename or "unknown")
+        # Validate filename and size before reading any of the file
+        validated_filename = validator.validate_upload(file.filename or "unknown", file_size)
         
-        # Validate file type
-        allowed_types = settings.allowed_file_types.split(',')
-        content_type = validate_file_type(validated_filename, allowed_types, file_content)
+        # Only the head of the file is needed for content sniffing
+        head = await file.read(SNIFF_BYTES)
+        await file.seek(0)
         
-        # Validate file size
-        validate_file_size(len(file_content), settings.max_file_size_mb)
+        # libmagic may sniff the head, so keep type detection off the event loop
+        content_type = await run_in_threadpool(validator.validate_type, validated_filename, head)
         
-        # Upload file
-        upload_response = await storage_service.upload_file(
-            file_content=file_content,
+        # Stream the spooled file to storage
+        upload_response = await storage_service.upload_fileobj(
+            fileobj=file.file,
             filename=validated_filename,
-            content_type=content_type
+            content_type=content_type,
+            max_size_bytes=validator.max_size_bytes
         )
         
-        logger.info(f"User {current_user.get('user_id')} uploaded file {validated_filename}")
+        logger.info("User %s uploaded file %s", current_user.get('user_id'), validated_filename)
         
-        return APIResponse(
-            success=True,
-            message="File uploaded successfully",
-            data=upload_response
-        )
+        return api_response("File uploaded successfully", upload_response, date_format=date_format)
         
+    except HTTPException:
+        raise
     except FileValidationError as e:
-        logger.warning(f"File validation failed: {str(e)}")
+        logger.warning("File validation failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except StorageServiceError as e:
-        logger.error(f"Storage service error: {str(e)}")
+        logger.error("Storage service error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error during file upload: {str(e)}")
+        logger.error("Unexpected error during file upload: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.post("/multiple", response_model=APIResponse[MultipleFileUploadResponse])
+def _upload_size(file: UploadFile) -> int:
+    """Get the size of an upload in bytes without reading it."""
+    if file.size is not None:
+        return file.size
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
+def _etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+async def _process_one(
+    file: UploadFile,
+    validator: FileValidator,
+    storage_service: S3Service
+) -> Optional[FileUploadResponse]:
+    """
+    Validate and upload one file of a multiple-file upload.
+    
+    Args:
+        file: The file to upload
+        validator: Upload validation rules
+        storage_service: Storage service instance
+        
+    Returns:
+        FileUploadResponse, or None if the file was rejected or failed to upload
+    """
+    try:
+        # Validate filename and size before reading any of the file
+        validated_filename = validator.validate_upload(file.filename or "unknown", _upload_size(file))
+        
+        # Only the head of the file is needed for content sniffing
+        head = await file.read(SNIFF_BYTES)
+        await file.seek(0)
+        
+        # libmagic may sniff the head, so keep type detection off the event loop
+        content_type = await run_in_threadpool(validator.validate_type, validated_filename, head)
+        
+        # Stream the spooled file to storage
+        return await storage_service.upload_fileobj(
+            fileobj=file.file,
+            filename=validated_filename,
+            content_type=content_type,
+            max_size_bytes=validator.max_size_bytes
+        )
+        
+    except FileValidationError as e:
+        logger.warning("File validation failed for %s: %s", file.filename, e)
+        return None
+    except Exception as e:
+        logger.error("Error uploading file %s: %s", file.filename, e)
+        return None
+
+
+@router.post("/multiple", responses={200: {"model": APIResponse[MultipleFileUploadResponse]}})
 async def upload_multiple_files(
     files: List[UploadFile] = File(...),
     current_user: dict = Depends(get_current_user),
-    storage_service: S3Service = Depends(get_storage_service)
+    storage_service: S3Service = Depends(get_storage_service),
+    date_format: DateFormat = Depends(get_date_format)
 ):
     """
     Upload multiple files to storage.
@@ -124,125 +204,108 @@ async def upload_multiple_files(
         files: List of files to upload
         current_user: Current authenticated user
         storage_service: Storage service instance
+        date_format: Timestamp format for the response
         
     Returns:
         APIResponse with multiple file upload details
     """
     try:
+        # Resolve settings once for the whole batch
         settings = get_settings()
-        uploaded_files = []
-        total_size = 0
-        
-        # Process each file
-        for file in files:
-            try:
-                # Read file content
-                file_content = await file.read()
-                
-                # Validate filename
-                validated_filename = validate_filename(file.filename or "unknown")
-                
-                # Validate file type
-                allowed_types = settings.allowed_file_types.split(',')
-                content_type = validate_file_type(validated_filename, allowed_types, file_content)
-                
-                # Validate file size
-                validate_file_size(len(file_content), settings.max_file_size_mb)
-                
-                # Upload file
-                upload_response = await storage_service.upload_file(
-                    file_content=file_content,
-                    filename=validated_filename,
-                    content_type=content_type
-                )
-                
-                uploaded_files.append(upload_response)
-                total_size += len(file_content)
-                
-            except FileValidationError as e:
-                logger.warning(f"File validation failed for {file.filename}: {str(e)}")
-                # Continue with other files
-                continue
-            except Exception as e:
-                logger.error(f"Error uploading file {file.filename}: {str(e)}")
-                # Continue with other files
-                continue
+        validator = get_file_validator(settings.allowed_file_types_set, settings.max_file_size_mb)
+        semaphore = asyncio.Semaphore(settings.max_concurrent_uploads)
+        
+        async def guarded(file: UploadFile) -> Optional[FileUploadResponse]:
+            async with semaphore:
+                return await _process_one(file, validator, storage_service)
+        
+        # Read, validate and upload each file in its own task; failed files come
+        # back as None, and the group cancels any stragglers if the request dies
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(guarded(file)) for file in files]
+        uploaded_files = [task.result() for task in tasks if task.result() is not None]
+        total_size = sum(result.file_size for result in uploaded_files)
         
         if not uploaded_files:
             raise HTTPException(status_code=400, detail="No files were successfully uploaded")
         
-        logger.info(f"User {current_user.get('user_id')} uploaded {len(uploaded_files)} files")
+        logger.info("User %s uploaded %s files", current_user.get('user_id'), len(uploaded_files))
         
-        response_data = MultipleFileUploadResponse(
+        # Totals were computed above from the upload results, so skip re-validating them
+        response_data = MultipleFileUploadResponse.model_construct(
             uploaded_files=uploaded_files,
             total_files=len(uploaded_files),
             total_size=total_size
         )
         
-        return APIResponse(
-            success=True,
-            message=f"Successfully uploaded {len(uploaded_files)} files",
-            data=response_data
-        )
+        return api_response(f"Successfully uploaded {len(uploaded_files)} files", response_data, date_format=date_format)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error during multiple file upload: {str(e)}")
+        logger.error("Unexpected error during multiple file upload: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/status/{file_id}", response_model=APIResponse[dict])
+@router.get("/status/{file_id}", responses={200: {"model": APIResponse[dict]}})
 async def get_upload_status(
     file_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_user),
-    storage_service: S3Service = Depends(get_storage_service)
+    storage_service: S3Service = Depends(get_storage_service),
+    date_format: DateFormat = Depends(get_date_format)
 ):
     """
     Get the status of an uploaded file.
     
+    The response carries the object's ETag; a request whose If-None-Match
+    matches it gets an empty 304 instead.
+    
     Args:
         file_id: UUID of the uploaded file
+        request: Incoming request, for its If-None-Match header
         current_user: Current authenticated user
         storage_service: Storage service instance
+        date_format: Timestamp format for the response
         
     Returns:
         APIResponse with file status details
     """
     try:
-        from uuid import UUID
-        
-        # Validate UUID format
-        try:
-            file_uuid = UUID(file_id)
-        except ValueError:
+        # Validate UUID format; the regex turns away junk IDs before UUID() parses anything
+        if not _UUID_RE.fullmatch(file_id):
             raise HTTPException(status_code=400, detail="Invalid file ID format")
+        file_uuid = UUID(file_id)
         
         # Get file status
         file_status = await storage_service.get_file_status(file_uuid)
         
-        return APIResponse(
-            success=True,
-            message="File status retrieved successfully",
-            data=file_status.dict()
-        )
+        if _etag_matches(request.headers.get("if-none-match"), file_status.etag):
+            return Response(status_code=304, headers={"ETag": file_status.etag})
+        
+        response = api_response("File status retrieved successfully", file_status, date_format=date_format)
+        if file_status.etag:
+            response.headers["ETag"] = file_status.etag
+        return response
         
     except StorageServiceError as e:
-        logger.error(f"Storage service error: {str(e)}")
+        logger.error("Storage service error: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error getting file status: {str(e)}")
+        logger.error("Unexpected error getting file status: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/list", response_model=APIResponse[dict])
+@router.get("/list", responses={200: {"model": APIResponse[dict]}})
 async def list_files(
     prefix: str = "",
     max_keys: int = 100,
+    include_metadata: bool = True,
     current_user: dict = Depends(get_current_user),
-    storage_service: S3Service = Depends(get_storage_service)
+    storage_service: S3Service = Depends(get_storage_service),
+    date_format: DateFormat = Depends(get_date_format)
 ):
     """
     List files in the storage bucket.
@@ -250,8 +313,10 @@ async def list_files(
     Args:
         prefix: Optional prefix to filter files (e.g., "uploads/")
         max_keys: Maximum number of files to return (default: 100)
+        include_metadata: Fetch file ID, original name and content type per file (default: true)
         current_user: Current authenticated user
         storage_service: Storage service instance
+        date_format: Timestamp format for the response
         
     Returns:
         APIResponse with list of files
@@ -262,10 +327,11 @@ async def list_files(
             raise HTTPException(status_code=400, detail="max_keys must be between 1 and 1000")
         
         # List files
-        files = await storage_service.list_files(prefix=prefix, max_keys=max_keys)
-        
-        # Calculate total size
-        total_size = sum(file.get('size', 0) for file in files)
+        files, total_size = await storage_service.list_files(
+            prefix=prefix,
+            max_keys=max_keys,
+            include_metadata=include_metadata
+        )
         
         response_data = {
             "files": files,
@@ -275,29 +341,89 @@ async def list_files(
             "max_keys": max_keys
         }
         
-        return APIResponse(
-            success=True,
-            message=f"Successfully listed {len(files)} files",
-            data=response_data
+        return api_response(f"Successfully listed {len(files)} files", response_data, date_format=date_format)
+        
+    except StorageServiceError as e:
+        logger.error("Storage service error: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error listing files: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/list/stream")
+async def stream_files(
+    prefix: str = "",
+    max_keys: int = 1000,
+    include_metadata: bool = True,
+    current_user: dict = Depends(get_current_user),
+    storage_service: S3Service = Depends(get_storage_service),
+    date_format: DateFormat = Depends(get_date_format)
+):
+    """
+    Stream files in the storage bucket as newline-delimited JSON.
+    
+    Each line is one file entry, in the same shape as /list. Listing pages
+    are sent as they arrive from S3, so large listings start immediately and
+    are never held in memory as a whole.
+    
+    Args:
+        prefix: Optional prefix to filter files (e.g., "uploads/")
+        max_keys: Maximum number of files to return (default: 1000)
+        include_metadata: Fetch file ID, original name and content type per file (default: true)
+        current_user: Current authenticated user
+        storage_service: Storage service instance
+        date_format: Timestamp format for the response
+        
+    Returns:
+        StreamingResponse of application/x-ndjson
+    """
+    try:
+        # Validate max_keys
+        if max_keys <= 0 or max_keys > STREAM_MAX_KEYS:
+            raise HTTPException(status_code=400, detail=f"max_keys must be between 1 and {STREAM_MAX_KEYS}")
+        
+        files = storage_service.iter_files(
+            prefix=prefix,
+            max_keys=max_keys,
+            include_metadata=include_metadata
         )
+        # Fetch the first entry before answering, so listing errors still get a proper status code
+        first = await anext(files, None)
         
     except StorageServiceError as e:
-        logger.error(f"Storage service error: {str(e)}")
+        logger.error("Storage service error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error listing files: {str(e)}")
+        logger.error("Unexpected error listing files: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
+    
+    async def lines():
+        if first is None:
+            return
+        yield dump_json(first, date_format) + b"\n"
+        try:
+            async for file_info in files:
+                yield dump_json(file_info, date_format) + b"\n"
+        except StorageServiceError as e:
+            # Headers are already sent; the client sees a truncated stream
+            logger.error("Storage service error while streaming file list: %s", e)
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
-@router.get("/presigned-download/{file_id}", response_model=APIResponse[PresignedDownloadResponse])
+@router.get("/presigned-download/{file_id}", responses={200: {"model": APIResponse[PresignedDownloadResponse]}})
 async def get_presigned_download_url(
     file_id: str,
     filename: str,
     expiration: int = 3600,
     current_user: dict = Depends(get_current_user),
-    storage_service: S3Service = Depends(get_storage_service)
+    storage_service: S3Service = Depends(get_storage_service),
+    date_format: DateFormat = Depends(get_date_format)
 ):
     """
     Generate a presigned URL for downloading a file from S3.
@@ -308,6 +434,7 @@ async def get_presigned_download_url(
         expiration: URL expiration time in seconds (default: 3600 = 1 hour)
         current_user: Current authenticated user
         storage_service: Storage service instance
+        date_format: Timestamp format for the response
         
     Returns:
         APIResponse with presigned download URL
@@ -320,11 +447,15 @@ async def get_presigned_download_url(
                 detail="Expiration time must be between 1 and 604800 seconds (7 days)"
             )
         
+        # Reject anything that isn't a file ID before it reaches an S3 key
+        if not _UUID_RE.fullmatch(file_id):
+            raise HTTPException(status_code=400, detail="Invalid file ID format")
+        
         # Validate filename
         validated_filename = validate_filename(filename)
         
         # Generate presigned download URL
-        download_url = await storage_service.generate_presigned_download_url(
+        download_url, etag = await storage_service.generate_presigned_download_url(
             file_id=file_id,
             filename=validated_filename,
             expiration=expiration
@@ -333,42 +464,40 @@ async def get_presigned_download_url(
         from datetime import datetime, timedelta
         expires_at = datetime.utcnow() + timedelta(seconds=expiration)
         
-        response_data = PresignedDownloadResponse(
+        response_data = PresignedDownloadResponse.model_construct(
             file_id=file_id,
             filename=validated_filename,
             download_url=download_url,
             expires_in=expiration,
-            expires_at=expires_at
+            expires_at=expires_at,
+            etag=etag
         )
         
-        logger.info(f"User {current_user.get('user_id')} requested presigned download URL for {validated_filename}")
+        logger.info("User %s requested presigned download URL for %s", current_user.get('user_id'), validated_filename)
         
-        return APIResponse(
-            success=True,
-            message="Presigned download URL generated successfully",
-            data=response_data
-        )
+        return api_response("Presigned download URL generated successfully", response_data, date_format=date_format)
         
     except FileValidationError as e:
-        logger.warning(f"File validation failed: {str(e)}")
+        logger.warning("File validation failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except StorageServiceError as e:
-        logger.error(f"Storage service error: {str(e)}")
+        logger.error("Storage service error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating presigned download URL: {str(e)}")
+        logger.error("Unexpected error generating presigned download URL: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.post("/presigned-upload", response_model=APIResponse[PresignedUploadResponse])
+@router.post("/presigned-upload", responses={200: {"model": APIResponse[PresignedUploadResponse]}})
 async def get_presigned_upload_url(
     filename: str = Form(...),
     content_type: str = Form(...),
     expiration: int = 3600,
     current_user: dict = Depends(get_current_user),
-    storage_service: S3Service = Depends(get_storage_service)
+    storage_service: S3Service = Depends(get_storage_service),
+    date_format: DateFormat = Depends(get_date_format)
 ):
     """
     Generate a presigned URL for uploading a file to S3.
@@ -379,6 +508,7 @@ async def get_presigned_upload_url(
         expiration: URL expiration time in seconds (default: 3600 = 1 hour)
         current_user: Current authenticated user
         storage_service: Storage service instance
+        date_format: Timestamp format for the response
         
     Returns:
         APIResponse with presigned upload URL and form fields
@@ -396,11 +526,11 @@ async def get_presigned_upload_url(
         
         # Validate content type
         settings = get_settings()
-        allowed_types = settings.allowed_file_types.split(',')
+        allowed_types = settings.allowed_file_types_set
         if content_type not in allowed_types:
             raise HTTPException(
                 status_code=400,
-                detail=f"Content type '{content_type}' not allowed. Allowed types: {', '.join(allowed_types)}"
+                detail=f"Content type '{content_type}' not allowed. Allowed types: {', '.join(sorted(allowed_types))}"
             )
         
         # Generate unique file ID
@@ -412,13 +542,14 @@ async def get_presigned_upload_url(
             file_id=file_id,
             filename=validated_filename,
             content_type=content_type,
-            expiration=expiration
+            expiration=expiration,
+            max_size_bytes=settings.max_file_size_mb * 1024 * 1024
         )
         
         from datetime import datetime, timedelta
         expires_at = datetime.utcnow() + timedelta(seconds=expiration)
         
-        response_data = PresignedUploadResponse(
+        response_data = PresignedUploadResponse.model_construct(
             file_id=file_id,
             filename=validated_filename,
             upload_url=presigned_post['url'],
@@ -427,22 +558,18 @@ async def get_presigned_upload_url(
             expires_at=expires_at
         )
         
-        logger.info(f"User {current_user.get('user_id')} requested presigned upload URL for {validated_filename}")
+        logger.info("User %s requested presigned upload URL for %s", current_user.get('user_id'), validated_filename)
         
-        return APIResponse(
-            success=True,
-            message="Presigned upload URL generated successfully",
-            data=response_data
-        )
+        return api_response("Presigned upload URL generated successfully", response_data, date_format=date_format)
         
     except FileValidationError as e:
-        logger.warning(f"File validation failed: {str(e)}")
+        logger.warning("File validation failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except StorageServiceError as e:
-        logger.error(f"Storage service error: {str(e)}")
+        logger.error("Storage service error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating presigned upload URL: {str(e)}")
+        logger.error("Unexpected error generating presigned upload URL: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -2,19 +2,123 @@
 AWS S3 storage service implementation.
 """
 
-import boto3
+import aioboto3
+import asyncio
+import io
 import logging
+import time
+from contextlib import AsyncExitStack
 from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from typing import AsyncIterator, BinaryIO, List, Optional, Tuple
 from uuid import UUID, uuid4
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError
+from cachetools import TTLCache
 from ..models.file_models import FileUploadResponse, FileStatusResponse
-from ..utils.exceptions import StorageServiceError, ConfigurationError
+from ..utils.exceptions import StorageServiceError, ConfigurationError, FileValidationError
 from .storage_interface import StorageInterface
 
 
 logger = logging.getLogger(__name__)
 
+# The client is shared by every request in the process, so give it a pool
+# big enough for concurrent uploads and their multipart parts (roughly
+# TRANSFER_CONFIG.max_concurrency x files uploading at once), keep idle
+# connections alive, and retry throttling and transient errors
+CLIENT_CONFIG = Config(
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'mode': 'standard', 'max_attempts': 3}
+)
+
+# Files above the threshold go up as a multipart upload in 8 MB parts,
+# up to 10 parts in flight per file
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10
+)
+
+# S3 rejects multipart parts (other than the last) smaller than 5 MB
+MIN_MULTIPART_BYTES = 5 * 1024 * 1024
+
+
+def _content_disposition(filename: str) -> str:
+    """Build an attachment Content-Disposition header value for filename."""
+    escaped = filename.replace('\\', '\\\\').replace('"', '\\"')
+    return f'attachment; filename="{escaped}"'
+
+
+def _uploaded_at(metadata: dict, last_modified: datetime) -> datetime:
+    """Read the upload time recorded in metadata, falling back to LastModified."""
+    # fromisoformat reads the trailing "Z" form natively
+    uploaded_at_str = metadata.get('uploaded_at')
+    if uploaded_at_str:
+        try:
+            return datetime.fromisoformat(uploaded_at_str)
+        except ValueError:
+            pass
+    return last_modified
+
+
+@lru_cache(maxsize=32)
+def _transfer_config(max_concurrency: int, multipart_threshold: int) -> TransferConfig:
+    """Get a TransferConfig for per-upload overrides, shared between uploads that ask for the same."""
+    return TransferConfig(
+        multipart_threshold=multipart_threshold,
+        multipart_chunksize=max(multipart_threshold, MIN_MULTIPART_BYTES),
+        max_concurrency=max_concurrency
+    )
+
+# Concurrent head_object calls per list_files request
+HEAD_CONCURRENCY = 32
+
+# Presigned download URLs are reused within windows of this many seconds
+PRESIGN_WINDOW_SECONDS = 300
+
+# SigV4 presigned URLs can't be valid for longer than 7 days
+MAX_PRESIGN_EXPIRY_SECONDS = 604800
+
+# delete_objects accepts at most this many keys per call
+DELETE_BATCH_SIZE = 1000
+
+# list_files results are served from memory for this many seconds
+LIST_CACHE_TTL_SECONDS = 30
+
+# get_file_status results are served from memory for this many seconds
+STATUS_CACHE_TTL_SECONDS = 30
+
+
+class CountingReader:
+    """
+    Read-only file wrapper that counts bytes as the S3 client pulls them.
+    
+    It deliberately has no seek(), so the uploader reads it once, front to
+    back. Reading past max_bytes raises FileValidationError, which
+    aborts the upload (including any multipart upload already started).
+    """
+    
+    def __init__(self, fileobj: BinaryIO, max_bytes: Optional[int] = None):
+        self._fileobj = fileobj
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._fileobj.read(size)
+        self.bytes_read += len(chunk)
+        self.check()
+        return chunk
+    
+    def check(self) -> None:
+        """Raise FileValidationError if more than max_bytes have been read."""
+        if self.max_bytes is not None and self.bytes_read > self.max_bytes:
+            raise FileValidationError(
+                f"File size exceeds maximum allowed size ({self.max_bytes} bytes)",
+                details={"max_size_bytes": self.max_bytes}
+            )
+
 
 class S3Service(StorageInterface):
     """AWS S3 storage service implementation."""
@@ -26,7 +130,8 @@ class S3Service(StorageInterface):
         region_name: str,
         bucket_name: str,
         upload_path: str = "uploads/",
-        aws_session_token: str = None
+        aws_session_token: str = None,
+        cache_results: bool = True
     ):
         """
         Initialize S3 service.
@@ -37,6 +142,8 @@ class S3Service(StorageInterface):
             region_name: AWS region name
             bucket_name: S3 bucket name
             upload_path: Path prefix for uploads
+            cache_results: Serve list and status results from memory; only safe
+                when a single process serves the API
         """
         self.aws_access_key_id = aws_access_key_id
         self.aws_secret_access_key = aws_secret_access_key
@@ -44,10 +151,11 @@ class S3Service(StorageInterface):
         self.region_name = region_name
         self.bucket_name = bucket_name
         self.upload_path = upload_path.rstrip('/') + '/'
+        self.cache_results = cache_results
         
-        # Initialize S3 client
+        # Initialize S3 session; the client itself is opened by connect()
         try:
-            client_kwargs = {
+            session_kwargs = {
                 'aws_access_key_id': self.aws_access_key_id,
                 'aws_secret_access_key': self.aws_secret_access_key,
                 'region_name': self.region_name
@@ -55,60 +163,150 @@ class S3Service(StorageInterface):
             
             # Add session token if provided
             if self.aws_session_token:
-                client_kwargs['aws_session_token'] = self.aws_session_token
+                session_kwargs['aws_session_token'] = self.aws_session_token
             
-            self.s3_client = boto3.client('s3', **client_kwargs)
+            self.session = aioboto3.Session(**session_kwargs)
         except NoCredentialsError:
             raise ConfigurationError("AWS credentials not found")
+        except Exception as e:
+            raise ConfigurationError(f"Failed to initialize S3 session: {str(e)}")
+        
+        self.s3_client = None
+        self._exit_stack = AsyncExitStack()
+        self._presign_cache = TTLCache(maxsize=10_000, ttl=PRESIGN_WINDOW_SECONDS)
+        # Cleared by uploads and deletes in this process only; writes made by
+        # other workers or through a presigned POST show up once the entry expires
+        self._list_cache = TTLCache(maxsize=256, ttl=LIST_CACHE_TTL_SECONDS)
+        # Found files only; an object's status doesn't change until it is deleted
+        self._status_cache = TTLCache(maxsize=10_000, ttl=STATUS_CACHE_TTL_SECONDS)
+    
+    async def connect(self) -> None:
+        """Open the long-lived async S3 client. Call once at startup."""
+        try:
+            self.s3_client = await self._exit_stack.enter_async_context(
+                self.session.client('s3', config=CLIENT_CONFIG)
+            )
         except Exception as e:
             raise ConfigurationError(f"Failed to initialize S3 client: {str(e)}")
     
+    async def close(self) -> None:
+        """Close the S3 client and its connection pool."""
+        await self._exit_stack.aclose()
+        self.s3_client = None
+    
+    def _object_key(self, file_id) -> str:
+        """Get the S3 key a file is stored under."""
+        return f"{self.upload_path}{file_id}"
+    
+    async def _head_file(self, file_id) -> Tuple[str, dict]:
+        """
+        Find a file's S3 key and object metadata.
+        
+        Files live at {upload_path}{file_id}, so this is normally a single HEAD.
+        Objects uploaded under the older {upload_path}{file_id}/{filename}
+        layout are found by listing that prefix.
+        """
+        s3_key = self._object_key(file_id)
+        try:
+            return s3_key, await self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('404', 'NoSuchKey'):
+                raise
+        
+        response = await self.s3_client.list_objects_v2(
+            Bucket=self.bucket_name,
+            Prefix=f"{s3_key}/",
+            MaxKeys=1
+        )
+        if not response.get('Contents'):
+            raise StorageServiceError(f"File with ID {file_id} not found")
+        
+        s3_key = response['Contents'][0]['Key']
+        return s3_key, await self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+    
     async def upload_file(
         self, 
         file_content: bytes, 
         filename: str, 
         content_type: str,
-        file_id: Optional[UUID] = None
+        file_id: Optional[UUID] = None,
+        max_concurrency: Optional[int] = None,
+        multipart_threshold: Optional[int] = None
     ) -> FileUploadResponse:
         """Upload a single file to S3."""
+        # Share the streaming path so large payloads go up as a multipart upload too
+        return await self.upload_fileobj(
+            io.BytesIO(file_content), filename, content_type, file_id,
+            max_concurrency=max_concurrency,
+            multipart_threshold=multipart_threshold
+        )
+    
+    async def upload_fileobj(
+        self,
+        fileobj: BinaryIO,
+        filename: str,
+        content_type: str,
+        file_id: Optional[UUID] = None,
+        max_size_bytes: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        multipart_threshold: Optional[int] = None
+    ) -> FileUploadResponse:
+        """Stream a file object to S3 without reading it into memory first."""
         if file_id is None:
             file_id = uuid4()
         
-        # Generate S3 key
-        s3_key = f"{self.upload_path}{file_id}/{filename}"
+        transfer_config = TRANSFER_CONFIG
+        if max_concurrency is not None or multipart_threshold is not None:
+            # Keep parts in flight within the client's connection pool and parts
+            # at least as large as S3 accepts
+            transfer_config = _transfer_config(
+                min(max(max_concurrency or TRANSFER_CONFIG.max_concurrency, 1), CLIENT_CONFIG.max_pool_connections),
+                max(multipart_threshold or TRANSFER_CONFIG.multipart_threshold, MIN_MULTIPART_BYTES)
+            )
+        
+        # Generate S3 key; the filename is kept in the object metadata
+        s3_key = self._object_key(file_id)
+        reader = CountingReader(fileobj, max_size_bytes)
+        uploaded_at = datetime.utcnow()
         
         try:
-            # Upload file to S3
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=file_content,
-                ContentType=content_type,
-                Metadata={
-                    'file_id': str(file_id),
-                    'original_filename': filename,
-                    'uploaded_at': datetime.utcnow().isoformat()
-                }
+            # Small files go up with one PUT, larger ones as a multipart upload
+            await self.s3_client.upload_fileobj(
+                reader,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs={
+                    'ContentType': content_type,
+                    'Metadata': {
+                        'file_id': str(file_id),
+                        'original_filename': filename,
+                        'uploaded_at': uploaded_at.isoformat()
+                    }
+                },
+                Config=transfer_config
             )
             
             # Generate storage URL
             storage_url = f"https://{self.bucket_name}.s3.{self.region_name}.amazonaws.com/{s3_key}"
             
-            logger.info(f"Successfully uploaded file {filename} to S3 with key {s3_key}")
+            logger.info("Successfully uploaded file %s to S3 with key %s", filename, s3_key)
+            self._list_cache.clear()
             
-            return FileUploadResponse(
+            return FileUploadResponse.model_construct(
                 file_id=file_id,
                 filename=filename,
-                file_size=len(file_content),
+                file_size=reader.bytes_read,
                 file_type=content_type,
                 storage_url=storage_url,
-                uploaded_at=datetime.utcnow()
+                uploaded_at=uploaded_at
             )
             
+        except FileValidationError:
+            raise
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
-            logger.error(f"S3 upload failed: {error_code} - {error_message}")
+            logger.error("S3 upload failed: %s - %s", error_code, error_message)
             raise StorageServiceError(
                 f"Failed to upload file to S3: {error_message}",
                 details={
@@ -118,7 +316,9 @@ class S3Service(StorageInterface):
                 }
             )
         except Exception as e:
-            logger.error(f"Unexpected error during S3 upload: {str(e)}")
+            # The uploader may surface the reader's size error wrapped; report it as such
+            reader.check()
+            logger.error("Unexpected error during S3 upload: %s", e)
             raise StorageServiceError(
                 f"Unexpected error during file upload: {str(e)}",
                 details={"filename": filename}
@@ -129,74 +329,85 @@ class S3Service(StorageInterface):
         files: List[tuple[bytes, str, str]],
         file_ids: Optional[List[UUID]] = None
     ) -> List[FileUploadResponse]:
-        """Upload multiple files to S3."""
+        """Upload multiple files to S3; results are in completion order."""
+        results = [result async for result in self.upload_many_iter(files, file_ids)]
+        
+        if not results:
+            raise StorageServiceError("Failed to upload any files")
+        
+        return results
+    
+    async def upload_many_iter(
+        self,
+        files: List[tuple[bytes, str, str]],
+        file_ids: Optional[List[UUID]] = None,
+        concurrency: int = 8
+    ) -> AsyncIterator[FileUploadResponse]:
+        """
+        Upload multiple files to S3, yielding each result as soon as it finishes.
+        
+        A new upload starts whenever one completes, keeping up to concurrency
+        uploads in flight rather than waiting on batches.
+        """
         if file_ids is None:
             file_ids = [uuid4() for _ in files]
         
         if len(files) != len(file_ids):
             raise StorageServiceError("Number of files and file IDs must match")
         
-        results = []
-        for (file_content, filename, content_type), file_id in zip(files, file_ids):
-            try:
-                result = await self.upload_file(file_content, filename, content_type, file_id)
-                results.append(result)
-            except StorageServiceError as e:
-                logger.error(f"Failed to upload file {filename}: {str(e)}")
-                # Continue with other files, but log the error
-                continue
+        semaphore = asyncio.Semaphore(concurrency)
         
-        if not results:
-            raise StorageServiceError("Failed to upload any files")
+        async def upload_one(file_content: bytes, filename: str, content_type: str, file_id: UUID):
+            async with semaphore:
+                try:
+                    return await self.upload_file(file_content, filename, content_type, file_id)
+                except StorageServiceError as e:
+                    # Continue with other files, but log the error
+                    logger.error("Failed to upload file %s: %s", filename, e)
+                    return None
         
-        return results
+        tasks = [
+            asyncio.create_task(upload_one(file_content, filename, content_type, file_id))
+            for (file_content, filename, content_type), file_id in zip(files, file_ids)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result is not None:
+                    yield result
+        finally:
+            # The caller may stop iterating early; don't leave uploads running
+            for task in tasks:
+                task.cancel()
     
     async def get_file_status(self, file_id: UUID) -> FileStatusResponse:
         """Get the status of an uploaded file."""
+        file_status = self._status_cache.get(file_id) if self.cache_results else None
+        if file_status is not None:
+            return file_status
+        
         try:
-            # List objects with the file_id prefix
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=f"{self.upload_path}{file_id}/"
-            )
-            
-            if 'Contents' not in response or not response['Contents']:
-                raise StorageServiceError(f"File with ID {file_id} not found")
-            
-            # Get the first object (should be the file)
-            obj = response['Contents'][0]
-            s3_key = obj['Key']
-            
-            # Get object metadata
-            head_response = self.s3_client.head_object(
-                Bucket=self.bucket_name,
-                Key=s3_key
-            )
+            s3_key, head_response = await self._head_file(file_id)
             
             metadata = head_response.get('Metadata', {})
             original_filename = metadata.get('original_filename', 'unknown')
-            uploaded_at_str = metadata.get('uploaded_at')
             
-            # Parse uploaded_at timestamp
-            uploaded_at = None
-            if uploaded_at_str:
-                try:
-                    uploaded_at = datetime.fromisoformat(uploaded_at_str.replace('Z', '+00:00'))
-                except ValueError:
-                    uploaded_at = obj['LastModified']
-            else:
-                uploaded_at = obj['LastModified']
+            uploaded_at = _uploaded_at(metadata, head_response['LastModified'])
             
             # Generate storage URL
             storage_url = f"https://{self.bucket_name}.s3.{self.region_name}.amazonaws.com/{s3_key}"
             
-            return FileStatusResponse(
+            file_status = FileStatusResponse.model_construct(
                 file_id=file_id,
                 filename=original_filename,
                 status="uploaded",
                 storage_url=storage_url,
-                uploaded_at=uploaded_at
+                uploaded_at=uploaded_at,
+                etag=head_response.get('ETag')
             )
+            if self.cache_results:
+                self._status_cache[file_id] = file_status
+            return file_status
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
@@ -205,30 +416,39 @@ class S3Service(StorageInterface):
             else:
                 raise StorageServiceError(f"Failed to get file status: {e.response['Error']['Message']}")
         except Exception as e:
-            logger.error(f"Unexpected error getting file status: {str(e)}")
+            logger.error("Unexpected error getting file status: %s", e)
             raise StorageServiceError(f"Unexpected error getting file status: {str(e)}")
     
     async def delete_file(self, file_id: UUID) -> bool:
         """Delete a file from S3."""
         try:
-            # List objects with the file_id prefix
-            response = self.s3_client.list_objects_v2(
+            # The bare key prefix matches both {file_id} and legacy {file_id}/{filename} objects;
+            # page through it so nothing past the first 1000 keys is missed
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            pages = paginator.paginate(
                 Bucket=self.bucket_name,
-                Prefix=f"{self.upload_path}{file_id}/"
+                Prefix=self._object_key(file_id),
+                PaginationConfig={'PageSize': DELETE_BATCH_SIZE}
             )
             
-            if 'Contents' not in response or not response['Contents']:
+            deleted = 0
+            async for page in pages:
+                # Each page fits one delete_objects call
+                objects_to_delete = [{'Key': obj['Key']} for obj in page.get('Contents', [])]
+                if not objects_to_delete:
+                    continue
+                await self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={'Objects': objects_to_delete, 'Quiet': True}
+                )
+                deleted += len(objects_to_delete)
+            
+            if not deleted:
                 raise StorageServiceError(f"File with ID {file_id} not found")
             
-            # Delete all objects with this prefix (in case there are multiple files)
-            objects_to_delete = [{'Key': obj['Key']} for obj in response['Contents']]
-            
-            self.s3_client.delete_objects(
-                Bucket=self.bucket_name,
-                Delete={'Objects': objects_to_delete}
-            )
-            
-            logger.info(f"Successfully deleted file {file_id} from S3")
+            self._list_cache.clear()
+            self._status_cache.pop(file_id, None)
+            logger.info("Successfully deleted file %s from S3", file_id)
             return True
             
         except ClientError as e:
@@ -238,57 +458,84 @@ class S3Service(StorageInterface):
             else:
                 raise StorageServiceError(f"Failed to delete file: {e.response['Error']['Message']}")
         except Exception as e:
-            logger.error(f"Unexpected error deleting file: {str(e)}")
+            logger.error("Unexpected error deleting file: %s", e)
             raise StorageServiceError(f"Unexpected error deleting file: {str(e)}")
     
-    async def list_files(self, prefix: str = "", max_keys: int = 100) -> List[dict]:
+    def _file_info(self, obj: dict) -> dict:
+        """Build the listing entry for one list_objects_v2 object."""
+        return {
+            "key": obj['Key'],
+            "size": obj['Size'],
+            "last_modified": obj['LastModified'],
+            "storage_class": obj.get('StorageClass', 'STANDARD'),
+            "url": f"https://{self.bucket_name}.s3.{self.region_name}.amazonaws.com/{obj['Key']}"
+        }
+    
+    async def _add_metadata(self, files: List[dict]) -> None:
+        """Add upload metadata to listing entries with concurrent HEADs rather than one at a time."""
+        semaphore = asyncio.Semaphore(HEAD_CONCURRENCY)
+        
+        async def add_metadata(file_info: dict) -> None:
+            async with semaphore:
+                try:
+                    head_response = await self.s3_client.head_object(
+                        Bucket=self.bucket_name,
+                        Key=file_info['key']
+                    )
+                except Exception:
+                    # If metadata retrieval fails, continue without it
+                    return
+            metadata = head_response.get('Metadata', {})
+            file_info.update({
+                "file_id": metadata.get('file_id'),
+                "original_filename": metadata.get('original_filename'),
+                # A datetime, so it is formatted like last_modified
+                "uploaded_at": _uploaded_at(metadata, file_info['last_modified']),
+                "content_type": head_response.get('ContentType')
+            })
+        
+        await asyncio.gather(*(
+            add_metadata(file_info) for file_info in files
+            if file_info['key'].startswith(self.upload_path)
+        ))
+    
+    async def list_files(
+        self,
+        prefix: str = "",
+        max_keys: int = 100,
+        include_metadata: bool = True
+    ) -> Tuple[List[dict], int]:
         """List files in the S3 bucket."""
+        cache_key = (prefix, max_keys, include_metadata)
+        cached = self._list_cache.get(cache_key) if self.cache_results else None
+        if cached is not None:
+            return cached
+        
         try:
             # List objects in the bucket
-            response = self.s3_client.list_objects_v2(
+            response = await self.s3_client.list_objects_v2(
                 Bucket=self.bucket_name,
                 Prefix=prefix,
                 MaxKeys=max_keys
             )
             
             files = []
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    # Extract file information
-                    file_info = {
-                        "key": obj['Key'],
-                        "size": obj['Size'],
-                        "last_modified": obj['LastModified'].isoformat() + "Z",
-                        "storage_class": obj.get('StorageClass', 'STANDARD'),
-                        "url": f"https://{self.bucket_name}.s3.{self.region_name}.amazonaws.com/{obj['Key']}"
-                    }
-                    
-                    # Try to get metadata for uploaded files
-                    if obj['Key'].startswith(self.upload_path):
-                        try:
-                            head_response = self.s3_client.head_object(
-                                Bucket=self.bucket_name,
-                                Key=obj['Key']
-                            )
-                            metadata = head_response.get('Metadata', {})
-                            file_info.update({
-                                "file_id": metadata.get('file_id'),
-                                "original_filename": metadata.get('original_filename'),
-                                "uploaded_at": metadata.get('uploaded_at'),
-                                "content_type": head_response.get('ContentType')
-                            })
-                        except Exception:
-                            # If metadata retrieval fails, continue without it
-                            pass
-                    
-                    files.append(file_info)
+            total_size = 0
+            for obj in response.get('Contents', []):
+                total_size += obj['Size']
+                files.append(self._file_info(obj))
+            
+            if include_metadata:
+                await self._add_metadata(files)
             
-            return files
+            if self.cache_results:
+                self._list_cache[cache_key] = (files, total_size)
+            return files, total_size
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
-            logger.error(f"S3 list files failed: {error_code} - {error_message}")
+            logger.error("S3 list files failed: %s - %s", error_code, error_message)
             raise StorageServiceError(
                 f"Failed to list files in S3: {error_message}",
                 details={
@@ -298,18 +545,58 @@ class S3Service(StorageInterface):
                 }
             )
         except Exception as e:
-            logger.error(f"Unexpected error listing files: {str(e)}")
+            logger.error("Unexpected error listing files: %s", e)
             raise StorageServiceError(
                 f"Unexpected error listing files: {str(e)}",
                 details={"prefix": prefix, "max_keys": max_keys}
             )
+    
+    async def iter_files(
+        self,
+        prefix: str = "",
+        max_keys: int = 1000,
+        include_metadata: bool = True
+    ) -> AsyncIterator[dict]:
+        """
+        Yield files in the S3 bucket one at a time.
+        
+        Keys are fetched page by page with the list_objects_v2 paginator, and
+        each page is yielded as soon as its metadata HEADs finish, so callers
+        can start sending results before the whole listing is known.
+        """
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            pages = paginator.paginate(
+                Bucket=self.bucket_name,
+                Prefix=prefix,
+                PaginationConfig={'MaxItems': max_keys, 'PageSize': min(max_keys, 1000)}
+            )
+            async for page in pages:
+                files = [self._file_info(obj) for obj in page.get('Contents', [])]
+                if include_metadata:
+                    await self._add_metadata(files)
+                for file_info in files:
+                    yield file_info
+            
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            error_message = e.response['Error']['Message']
+            logger.error("S3 list files failed: %s - %s", error_code, error_message)
+            raise StorageServiceError(
+                f"Failed to list files in S3: {error_message}",
+                details={
+                    "error_code": error_code,
+                    "prefix": prefix,
+                    "max_keys": max_keys
+                }
+            )
 
     async def generate_presigned_download_url(
         self, 
         file_id: str, 
         filename: str,
         expiration: int = 3600
-    ) -> str:
+    ) -> Tuple[str, Optional[str]]:
         """
         Generate a presigned URL for downloading a file from S3.
         
@@ -319,27 +606,53 @@ class S3Service(StorageInterface):
             expiration: URL expiration time in seconds (default: 1 hour)
             
         Returns:
-            Presigned URL for downloading the file
+            Tuple of (presigned URL, object ETag or None if the object wasn't found)
         """
+        # Round the absolute expiry up to a window boundary so repeat requests in
+        # the same window share one signed URL, valid at least as long as asked
+        now = int(time.time())
+        expires_at = -(-(now + expiration) // PRESIGN_WINDOW_SECONDS) * PRESIGN_WINDOW_SECONDS
+        if expires_at - now > MAX_PRESIGN_EXPIRY_SECONDS:
+            # Rounding up would pass the SigV4 limit; round down to a boundary instead
+            expires_at = (now + expiration) // PRESIGN_WINDOW_SECONDS * PRESIGN_WINDOW_SECONDS
+        cache_key = (file_id, filename, expires_at)
+        cached = self._presign_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            s3_key = f"{self.upload_path}{file_id}/{filename}"
-            
-            presigned_url = self.s3_client.generate_presigned_url(
+            s3_key = self._object_key(file_id)
+            etag = None
+            download_name = filename
+            try:
+                head_response = await self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+                etag = head_response.get('ETag')
+                # Keys no longer carry the filename, so name the download from metadata
+                download_name = head_response.get('Metadata', {}).get('original_filename', filename)
+            except ClientError as e:
+                if e.response['Error']['Code'] not in ('404', 'NoSuchKey'):
+                    raise
+                # Uploaded under the older {file_id}/{filename} layout
+                s3_key = f"{self.upload_path}{file_id}/{filename}"
+            
+            presigned_url = await self.s3_client.generate_presigned_url(
                 'get_object',
                 Params={
                     'Bucket': self.bucket_name,
-                    'Key': s3_key
+                    'Key': s3_key,
+                    'ResponseContentDisposition': _content_disposition(download_name)
                 },
-                ExpiresIn=expiration
+                ExpiresIn=expires_at - now
             )
             
-            logger.info(f"Generated presigned download URL for file {filename} (ID: {file_id})")
-            return presigned_url
+            self._presign_cache[cache_key] = (presigned_url, etag)
+            logger.info("Generated presigned download URL for file %s (ID: %s)", filename, file_id)
+            return presigned_url, etag
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
-            logger.error(f"S3 presigned download URL generation failed: {error_code} - {error_message}")
+            logger.error("S3 presigned download URL generation failed: %s - %s", error_code, error_message)
             raise StorageServiceError(
                 f"Failed to generate presigned download URL: {error_message}",
                 details={
@@ -349,7 +662,7 @@ class S3Service(StorageInterface):
                 }
             )
         except Exception as e:
-            logger.error(f"Unexpected error generating presigned download URL: {str(e)}")
+            logger.error("Unexpected error generating presigned download URL: %s", e)
             raise StorageServiceError(
                 f"Unexpected error generating presigned download URL: {str(e)}",
                 details={"file_id": file_id, "filename": filename}
@@ -360,7 +673,8 @@ class S3Service(StorageInterface):
         file_id: str, 
         filename: str,
         content_type: str,
-        expiration: int = 3600
+        expiration: int = 3600,
+        max_size_bytes: int = 104857600
     ) -> dict:
         """
         Generate a presigned URL for uploading a file to S3.
@@ -370,39 +684,43 @@ class S3Service(StorageInterface):
             filename: Name of the file
             content_type: MIME type of the file
             expiration: URL expiration time in seconds (default: 1 hour)
+            max_size_bytes: Largest upload S3 will accept under the policy
             
         Returns:
             Dictionary containing presigned URL and upload fields
         """
         try:
-            s3_key = f"{self.upload_path}{file_id}/{filename}"
+            s3_key = self._object_key(file_id)
+            uploaded_at = datetime.utcnow().isoformat()
             
-            # Generate presigned POST for multipart upload
-            presigned_post = self.s3_client.generate_presigned_post(
+            # Generate presigned POST for multipart upload; S3 rejects any form
+            # field without a matching policy condition
+            presigned_post = await self.s3_client.generate_presigned_post(
                 Bucket=self.bucket_name,
                 Key=s3_key,
                 Fields={
                     'Content-Type': content_type,
                     'x-amz-meta-file_id': file_id,
                     'x-amz-meta-original_filename': filename,
-                    'x-amz-meta-uploaded_at': datetime.utcnow().isoformat()
+                    'x-amz-meta-uploaded_at': uploaded_at
                 },
                 Conditions=[
                     {'Content-Type': content_type},
                     {'x-amz-meta-file_id': file_id},
                     {'x-amz-meta-original_filename': filename},
-                    ['content-length-range', 1, 104857600]  # 1 byte to 100MB
+                    {'x-amz-meta-uploaded_at': uploaded_at},
+                    ['content-length-range', 1, max_size_bytes]
                 ],
                 ExpiresIn=expiration
             )
             
-            logger.info(f"Generated presigned upload URL for file {filename} (ID: {file_id})")
+            logger.info("Generated presigned upload URL for file %s (ID: %s)", filename, file_id)
             return presigned_post
             
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
-            logger.error(f"S3 presigned upload URL generation failed: {error_code} - {error_message}")
+            logger.error("S3 presigned upload URL generation failed: %s - %s", error_code, error_message)
             raise StorageServiceError(
                 f"Failed to generate presigned upload URL: {error_message}",
                 details={
@@ -412,7 +730,7 @@ class S3Service(StorageInterface):
                 }
             )
         except Exception as e:
-            logger.error(f"Unexpected error generating presigned upload URL: {str(e)}")
+            logger.error("Unexpected error generating presigned upload URL: %s", e)
             raise StorageServiceError(
                 f"Unexpected error generating presigned upload URL: {str(e)}",
                 details={"file_id": file_id, "filename": filename}
@@ -422,7 +740,7 @@ class S3Service(StorageInterface):
         """Check if S3 service is healthy and accessible."""
         try:
             # Try to list objects in the bucket (limited to 1 object)
-            self.s3_client.list_objects_v2(
+            await self.s3_client.list_objects_v2(
                 Bucket=self.bucket_name,
                 MaxKeys=1
             )
@@ -5,13 +5,26 @@ This module defines the interface that all storage providers must implement.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, BinaryIO, List, Optional, Tuple
 from uuid import UUID
 from ..models.file_models import FileUploadResponse, FileStatusResponse
 
 
 class StorageInterface(ABC):
-    """Abstract base class for storage providers."""
+    """
+    Abstract base class for storage providers.
+    
+    One instance serves every request in the process. Implementations should
+    open a single long-lived client with a pooled, keep-alive connection in
+    connect() and reuse it for every call, rather than creating clients per
+    request or per operation.
+    """
+    
+    async def connect(self) -> None:
+        """Open the provider's client and connection pool. Called once at startup."""
+    
+    async def close(self) -> None:
+        """Close the provider's client and connection pool. Called once at shutdown."""
     
     @abstractmethod
     async def upload_file(
@@ -19,7 +32,9 @@ class StorageInterface(ABC):
         file_content: bytes, 
         filename: str, 
         content_type: str,
-        file_id: Optional[UUID] = None
+        file_id: Optional[UUID] = None,
+        max_concurrency: Optional[int] = None,
+        multipart_threshold: Optional[int] = None
     ) -> FileUploadResponse:
         """
         Upload a single file to storage.
@@ -29,11 +44,45 @@ class StorageInterface(ABC):
             filename: Name of the file
             content_type: MIME type of the file
             file_id: Optional UUID for the file
+            max_concurrency: Optional number of multipart parts to upload in parallel
+            multipart_threshold: Optional size in bytes above which to upload in parts
+            
+        Returns:
+            FileUploadResponse with upload details
+            
+        Raises:
+            StorageServiceError: If upload fails
+        """
+        pass
+    
+    @abstractmethod
+    async def upload_fileobj(
+        self,
+        fileobj: BinaryIO,
+        filename: str,
+        content_type: str,
+        file_id: Optional[UUID] = None,
+        max_size_bytes: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        multipart_threshold: Optional[int] = None
+    ) -> FileUploadResponse:
+        """
+        Upload a file from a file object, streaming it to storage.
+        
+        Args:
+            fileobj: Readable binary file object positioned at the start
+            filename: Name of the file
+            content_type: MIME type of the file
+            file_id: Optional UUID for the file
+            max_size_bytes: Optional limit; the upload is aborted past it
+            max_concurrency: Optional number of multipart parts to upload in parallel
+            multipart_threshold: Optional size in bytes above which to upload in parts
             
         Returns:
             FileUploadResponse with upload details
             
         Raises:
+            FileValidationError: If the file exceeds max_size_bytes
             StorageServiceError: If upload fails
         """
         pass
@@ -59,6 +108,30 @@ class StorageInterface(ABC):
         """
         pass
     
+    @abstractmethod
+    def upload_many_iter(
+        self,
+        files: List[tuple[bytes, str, str]],  # (content, filename, content_type)
+        file_ids: Optional[List[UUID]] = None,
+        concurrency: int = 8
+    ) -> AsyncIterator[FileUploadResponse]:
+        """
+        Upload multiple files with bounded concurrency, yielding each as it finishes.
+        
+        Args:
+            files: List of tuples containing (content, filename, content_type)
+            file_ids: Optional list of UUIDs for the files
+            concurrency: Maximum number of uploads in flight
+            
+        Returns:
+            Async iterator of FileUploadResponse objects, in completion order;
+            files that fail to upload are logged and skipped
+            
+        Raises:
+            StorageServiceError: If the number of files and file IDs differ
+        """
+        pass
+    
     @abstractmethod
     async def get_file_status(self, file_id: UUID) -> FileStatusResponse:
         """
@@ -92,16 +165,45 @@ class StorageInterface(ABC):
         pass
     
     @abstractmethod
-    async def list_files(self, prefix: str = "", max_keys: int = 100) -> List[dict]:
+    async def list_files(
+        self,
+        prefix: str = "",
+        max_keys: int = 100,
+        include_metadata: bool = True
+    ) -> Tuple[List[dict], int]:
         """
         List files in the storage bucket.
         
         Args:
             prefix: Optional prefix to filter files
             max_keys: Maximum number of files to return
+            include_metadata: Whether to fetch per-file upload metadata
             
         Returns:
-            List of file information dictionaries
+            Tuple of (file information dictionaries, total size of the files in bytes)
+        """
+        pass
+    
+    @abstractmethod
+    def iter_files(
+        self,
+        prefix: str = "",
+        max_keys: int = 1000,
+        include_metadata: bool = True
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over files in the storage bucket without collecting them first.
+        
+        Args:
+            prefix: Optional prefix to filter files
+            max_keys: Maximum number of files to yield
+            include_metadata: Whether to fetch per-file upload metadata
+            
+        Returns:
+            Async iterator of file information dictionaries
+            
+        Raises:
+            StorageServiceError: If listing fails
         """
         pass
     
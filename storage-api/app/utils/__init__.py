@@ -4,20 +4,36 @@ Utility functions for the Storage API.
 This module contains helper functions, validators, and custom exceptions.
 """
 
-from .validators import validate_file_type, validate_file_size, validate_filename
+from .validators import (
+    validate_file_type,
+    validate_file_size,
+    validate_filename,
+    FileValidator,
+    get_file_validator,
+    SNIFF_BYTES
+)
 from .exceptions import (
     StorageAPIException,
     FileValidationError,
     StorageServiceError,
     AuthenticationError
 )
+from .orjson_response import ORJSONResponse, EpochORJSONResponse, DateFormat, api_response, dump_json
 
 __all__ = [
     "validate_file_type",
     "validate_file_size",
     "validate_filename",
+    "FileValidator",
+    "get_file_validator",
+    "SNIFF_BYTES",
     "StorageAPIException",
     "FileValidationError",
     "StorageServiceError",
-    "AuthenticationError"
+    "AuthenticationError",
+    "ORJSONResponse",
+    "EpochORJSONResponse",
+    "DateFormat",
+    "api_response",
+    "dump_json"
 ]
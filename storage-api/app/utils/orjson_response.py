@@ -0,0 +1,95 @@
+"""
+orjson-backed JSON response class for the Storage API.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+# Wire format for timestamps, chosen per request with ?date_format=
+DateFormat = Literal["iso", "epoch"]
+
+
+def _default(obj: Any) -> Any:
+    """orjson fallback: encode models from their field dict, anything else as str."""
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    return str(obj)
+
+
+def _epoch_default(obj: Any) -> Any:
+    """Like _default, but datetimes (naive ones taken as UTC) become epoch seconds."""
+    if isinstance(obj, datetime):
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return int(obj.timestamp())
+    return _default(obj)
+
+
+def dump_json(content: Any, date_format: DateFormat = "iso") -> bytes:
+    """Serialize content to JSON bytes in the API wire format."""
+    if date_format == "epoch":
+        return orjson.dumps(
+            content,
+            default=_epoch_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    return orjson.dumps(
+        content,
+        default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+    )
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib json module.
+    
+    Naive datetimes are treated as UTC and written with a trailing "Z", and
+    UUIDs as their canonical string; this is the one place the wire format for
+    those types is defined. Pydantic models are encoded straight from their
+    field values, skipping model_dump(); models built with model_construct()
+    never touch the Pydantic serializer at all.
+    """
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+class EpochORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that writes datetimes as integer seconds since the epoch."""
+    
+    def render(self, content: Any) -> bytes:
+        return dump_json(content, "epoch")
+
+
+def api_response(
+    message: str,
+    data: Any = None,
+    success: bool = True,
+    date_format: DateFormat = "iso"
+) -> ORJSONResponse:
+    """
+    Build an APIResponse-shaped JSON response without validating a model.
+    
+    Args:
+        message: Response message
+        data: Response data - a Pydantic model, dict or None
+        success: Whether the request was successful
+        date_format: "iso" for ISO 8601 strings, "epoch" for integer seconds
+        
+    Returns:
+        ORJSONResponse with success, message, data and timestamp fields
+    """
+    response_class = EpochORJSONResponse if date_format == "epoch" else ORJSONResponse
+    return response_class({
+        "success": success,
+        "message": message,
+        "data": data,
+        "timestamp": datetime.utcnow()
+    })
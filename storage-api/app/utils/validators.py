@@ -2,24 +2,52 @@
 File validation utilities for the Storage API.
 """
 
-import os
+import re
 import mimetypes
-from typing import List, Set
+from functools import lru_cache
+from typing import Collection, FrozenSet, Optional, Union
 from .exceptions import FileValidationError
 
+try:
+    import magic
+    # One libmagic handle for the process; python-magic serializes calls on it
+    _MAGIC = magic.Magic(mime=True)
+except Exception:
+    # python-magic or libmagic missing: type detection falls back to extensions only
+    _MAGIC = None
+
+
+# Path separators, parent-directory references and characters that are unsafe
+# in object keys or on common filesystems, found in a single scan
+_DANGEROUS_FILENAME_RE = re.compile(r'\.\.|[/\\<>:"|?*]')
+
+# Leading bytes handed to libmagic for MIME type detection
+SNIFF_BYTES = 8192
+
+# Extensions classified by is_image_file / is_document_file
+_IMAGE_EXTENSIONS = frozenset({'jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp', 'svg', 'tiff', 'ico'})
+_DOCUMENT_EXTENSIONS = frozenset({'pdf', 'doc', 'docx', 'txt', 'rtf', 'odt', 'pages'})
+
+
+@lru_cache(maxsize=256)
+def _guess_mime(ext: str) -> Optional[str]:
+    """Guess the MIME type for a lowercased file extension (without the dot)."""
+    return mimetypes.guess_type(f"file.{ext}")[0]
+
 
 def validate_file_type(
     filename: str, 
-    allowed_types: List[str], 
-    file_content: bytes = None
+    allowed_types: Collection[str], 
+    file_head: Optional[Union[bytes, memoryview]] = None
 ) -> str:
     """
     Validate file type based on filename extension and optionally content.
     
     Args:
         filename: Name of the file
-        allowed_types: List of allowed MIME types
-        file_content: Optional file content for MIME type detection
+        allowed_types: Allowed MIME types (a set gives O(1) lookups)
+        file_head: Optional leading bytes of the file for MIME type detection;
+            pass only the head, not the whole upload (at most SNIFF_BYTES are used)
         
     Returns:
         Detected MIME type
@@ -30,15 +58,20 @@ def validate_file_type(
     if not filename:
         raise FileValidationError("Filename cannot be empty")
     
-    # Get MIME type from filename extension
-    mime_type, _ = mimetypes.guess_type(filename)
+    # Get MIME type from filename extension; uploads cluster on a few extensions,
+    # so the lookup is cached per extension
+    ext = get_file_extension(filename)
+    if ext and f".{ext}" not in mimetypes.encodings_map:
+        mime_type = _guess_mime(ext)
+    else:
+        # No extension, or a compression suffix (.tar.gz) that needs the full name
+        mime_type, _ = mimetypes.guess_type(filename)
     
     if not mime_type:
         # Try to detect from file content if provided
-        if file_content:
-            import magic
+        if file_head and _MAGIC is not None:
             try:
-                mime_type = magic.from_buffer(file_content, mime=True)
+                mime_type = _MAGIC.from_buffer(bytes(file_head[:SNIFF_BYTES]))
             except Exception:
                 pass
     
@@ -51,11 +84,11 @@ def validate_file_type(
     # Check if MIME type is allowed
     if mime_type not in allowed_types:
         raise FileValidationError(
-            f"File type '{mime_type}' is not allowed. Allowed types: {', '.join(allowed_types)}",
+            f"File type '{mime_type}' is not allowed. Allowed types: {', '.join(sorted(allowed_types))}",
             details={
                 "filename": filename,
                 "detected_type": mime_type,
-                "allowed_types": allowed_types
+                "allowed_types": sorted(allowed_types)
             }
         )
     
@@ -105,16 +138,16 @@ def validate_filename(filename: str) -> str:
     if not filename or not filename.strip():
         raise FileValidationError("Filename cannot be empty")
     
-    # Remove path separators and other dangerous characters
-    dangerous_chars = ['/', '\\', '..', '<', '>', ':', '"', '|', '?', '*']
+    # Reject path separators and other dangerous characters
     sanitized = filename.strip()
     
-    for char in dangerous_chars:
-        if char in sanitized:
-            raise FileValidationError(
-                f"Filename contains invalid character: '{char}'",
-                details={"filename": filename, "invalid_char": char}
-            )
+    match = _DANGEROUS_FILENAME_RE.search(sanitized)
+    if match:
+        char = match.group()
+        raise FileValidationError(
+            f"Filename contains invalid character: '{char}'",
+            details={"filename": filename, "invalid_char": char}
+        )
     
     # Check length
     if len(sanitized) > 255:
@@ -126,6 +159,67 @@ def validate_filename(filename: str) -> str:
     return sanitized
 
 
+class FileValidator:
+    """
+    Upload validation rules resolved once from settings.
+    
+    Instances come from get_file_validator, so requests running under the same
+    settings share one validator instead of rebuilding the rules each time.
+    """
+    
+    def __init__(self, allowed_types: FrozenSet[str], max_size_mb: int):
+        """
+        Initialize the validator.
+        
+        Args:
+            allowed_types: Allowed MIME types
+            max_size_mb: Maximum allowed size in megabytes
+        """
+        self.allowed_types = allowed_types
+        self.max_size_mb = max_size_mb
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+    
+    def validate_upload(self, filename: str, file_size: int) -> str:
+        """
+        Validate the filename and size of an upload before reading its content.
+        
+        Args:
+            filename: Original filename
+            file_size: Size of the file in bytes
+            
+        Returns:
+            Sanitized filename
+            
+        Raises:
+            FileValidationError: If the filename or size is invalid
+        """
+        sanitized = validate_filename(filename)
+        validate_file_size(file_size, self.max_size_mb)
+        return sanitized
+    
+    def validate_type(self, filename: str, head: Optional[bytes] = None) -> str:
+        """
+        Validate the file type from the filename and the head of the content.
+        
+        Args:
+            filename: Sanitized filename
+            head: Optional leading bytes of the file for MIME type detection
+            
+        Returns:
+            Detected MIME type
+            
+        Raises:
+            FileValidationError: If file type is not allowed
+        """
+        return validate_file_type(filename, self.allowed_types, head)
+
+
+@lru_cache(maxsize=4)
+def get_file_validator(allowed_types: FrozenSet[str], max_size_mb: int) -> FileValidator:
+    """Get the shared validator for a set of upload rules."""
+    return FileValidator(allowed_types, max_size_mb)
+
+
 def get_file_extension(filename: str) -> str:
     """
     Get file extension from filename.
@@ -136,8 +230,9 @@ def get_file_extension(filename: str) -> str:
     Returns:
         File extension (without dot)
     """
-    _, ext = os.path.splitext(filename)
-    return ext.lstrip('.').lower()
+    # Leading dots mark hidden files, not extensions (as with os.path.splitext)
+    _, dot, ext = filename.lstrip('.').rpartition('.')
+    return ext.lower() if dot else ''
 
 
 def is_image_file(filename: str) -> bool:
@@ -150,9 +245,7 @@ def is_image_file(filename: str) -> bool:
     Returns:
         True if file appears to be an image
     """
-    image_extensions = {'jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp', 'svg', 'tiff', 'ico'}
-    ext = get_file_extension(filename)
-    return ext in image_extensions
+    return get_file_extension(filename) in _IMAGE_EXTENSIONS
 
 
 def is_document_file(filename: str) -> bool:
@@ -165,6 +258,4 @@ def is_document_file(filename: str) -> bool:
     Returns:
         True if file appears to be a document
     """
-    doc_extensions = {'pdf', 'doc', 'docx', 'txt', 'rtf', 'odt', 'pages'}
-    ext = get_file_extension(filename)
-    return ext in doc_extensions
+    return get_file_extension(filename) in _DOCUMENT_EXTENSIONS
@@ -13,10 +13,13 @@ if __name__ == "__main__":
     print(f"Debug mode: {settings.debug}")
     print(f"Host: {settings.host}:{settings.port}")
     
+    # uvicorn[standard] installs uvloop and httptools, and the default "auto"
+    # loop/http settings use them wherever they are available
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=1 if settings.debug else settings.workers,
         log_level=settings.log_level.lower()
     )
@@ -3,26 +3,27 @@
 Test script for presigned URL endpoints.
 """
 
-import requests
+import asyncio
+import httpx
 import json
 
 # Configuration
 API_BASE_URL = "http://localhost:8001"
+NUM_FILES = 5  # presigned URLs requested concurrently
 
-def test_presigned_upload():
+async def test_presigned_upload(client, filename):
     """Test presigned upload URL generation."""
     try:
-        print("🧪 Testing Presigned Upload URL Generation...")
-        
-        response = requests.post(
-            f"{API_BASE_URL}/api/v1/upload/presigned-upload",
+        response = await client.post(
+            "/api/v1/upload/presigned-upload",
             data={
-                "filename": "test-document.pdf",
-                "content_type": "pdf",
+                "filename": filename,
+                "content_type": "application/pdf",
                 "expiration": 3600
             }
         )
         
+        print(f"\n🧪 Presigned Upload URL for {filename}")
         print(f"Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -42,19 +43,18 @@ def test_presigned_upload():
         print(f"❌ Error: {e}")
         return None
 
-def test_presigned_download(file_id):
+async def test_presigned_download(client, file_id, filename):
     """Test presigned download URL generation."""
     try:
-        print(f"\n🧪 Testing Presigned Download URL Generation for file {file_id}...")
-        
-        response = requests.get(
-            f"{API_BASE_URL}/api/v1/upload/presigned-download/{file_id}",
+        response = await client.get(
+            f"/api/v1/upload/presigned-download/{file_id}",
             params={
-                "filename": "test-document.pdf",
+                "filename": filename,
                 "expiration": 3600
             }
         )
         
+        print(f"\n🧪 Presigned Download URL for file {file_id}")
         print(f"Status: {response.status_code}")
         
         if response.status_code == 200:
@@ -71,11 +71,11 @@ def test_presigned_download(file_id):
     except Exception as e:
         print(f"❌ Error: {e}")
 
-def test_health():
+async def test_health(client):
     """Test API health."""
     try:
         print("🏥 Testing API Health...")
-        response = requests.get(f"{API_BASE_URL}/health")
+        response = await client.get("/health")
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
             print("✅ API is healthy!")
@@ -87,24 +87,29 @@ def test_health():
         print(f"❌ Error: {e}")
         return False
 
-def main():
+async def main():
     """Main test function."""
     print("🚀 Testing Storage API Presigned URLs")
     print("=" * 50)
     
-    # Test health first
-    if not test_health():
-        print("❌ API is not available. Please check if it's running.")
-        return
-    
-    # Test presigned upload
-    file_id = test_presigned_upload()
-    
-    # Test presigned download if upload was successful
-    if file_id:
-        test_presigned_download(file_id)
+    # One client for the whole run; concurrent requests share its keep-alive pool
+    async with httpx.AsyncClient(base_url=API_BASE_URL) as client:
+        # Test health first
+        if not await test_health(client):
+            print("❌ API is not available. Please check if it's running.")
+            return
+        
+        # Test presigned uploads, all requested at once
+        filenames = [f"test-document-{n}.pdf" for n in range(NUM_FILES)]
+        file_ids = await asyncio.gather(*(test_presigned_upload(client, name) for name in filenames))
+        
+        # Test presigned downloads for the uploads that succeeded
+        await asyncio.gather(*(
+            test_presigned_download(client, file_id, name)
+            for file_id, name in zip(file_ids, filenames) if file_id
+        ))
     
     print("\n🎉 Presigned URL tests completed!")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -15,7 +15,7 @@ Response:
     "filename": "VIP.pdf",
     "file_size": 1463774,
     "file_type": "application/pdf",
-    "storage_url": "https://dharmendra-ps.s3.us-east-1.amazonaws.com/uploads/791a9986-883d-447c-ac54-a7917dd42770/VIP.pdf",
+    "storage_url": "https://dharmendra-ps.s3.us-east-1.amazonaws.com/uploads/791a9986-883d-447c-ac54-a7917dd42770",
     "uploaded_at": "2025-10-25T08:41:39.311662Z"
   },
   "timestamp": "2025-10-25T08:41:39.311928Z"
@@ -29,14 +29,48 @@ import jwt
 import json
 from datetime import datetime, timedelta
 
+try:
+    # Optional: streams the multipart body instead of building it in memory
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
 # Configuration
 API_BASE_URL = "http://localhost:8001"
 FILE_PATH = "/Users/dharmendra.kumar/Downloads/VIP2.pdf"
 
+# One session for the whole run, so requests reuse the pooled keep-alive connection
+SESSION = requests.Session()
+
+def post_file(url, file, fields=None):
+    """POST a file as multipart/form-data, streaming it when requests_toolbelt is installed."""
+    if MultipartEncoder is not None:
+        # The file goes last; S3 ignores form fields after it
+        encoder = MultipartEncoder(fields={**(fields or {}), 'file': file})
+        return SESSION.post(url, data=encoder, headers={'Content-Type': encoder.content_type})
+    return SESSION.post(url, data=fields, files={'file': file})
+
+def upload_presigned(file, log):
+    """Upload a file straight to S3 through a presigned POST, recording the outcome in log."""
+    filename, _, content_type = file
+    response = SESSION.post(
+        f"{API_BASE_URL}/api/v1/upload/presigned-upload",
+        data={"filename": filename, "content_type": content_type}
+    )
+    response.raise_for_status()
+    presigned = response.json()['data']
+    
+    s3_response = post_file(presigned['upload_url'], file, fields=presigned['upload_fields'])
+    log["s3_status"] = s3_response.status_code
+    if s3_response.status_code not in (200, 201, 204):
+        log["error"] = s3_response.text
+        return None
+    return presigned
+
 def test_health():
     """Test the health endpoint."""
     try:
-        response = requests.get(f"{API_BASE_URL}/health")
+        response = SESSION.get(f"{API_BASE_URL}/health")
         print(f"Health Check: {response.status_code}")
         print(f"Response: {response.json()}")
         return response.status_code == 200
@@ -45,38 +79,39 @@ def test_health():
         return False
 
 def upload_file():
-    """Upload a file to the Storage API."""
+    """Upload a file to the Storage API, printing one JSON line with the outcome."""
+    log = {"file": FILE_PATH}
+    result = None
     try:
         # Prepare file
         with open(FILE_PATH, 'rb') as file:
-            files = {
-                'file': ('VIP.pdf', file, 'application/pdf')
-            }
+            upload = ('VIP.pdf', file, 'application/pdf')
             
             # Upload file
-            print(f"Uploading file: {FILE_PATH}")
-            response = requests.post(
-                f"{API_BASE_URL}/api/v1/upload/single",
-                files=files
-            )
-            
-            print(f"Upload Status: {response.status_code}")
-            print(f"Response: {response.text}")
+            response = post_file(f"{API_BASE_URL}/api/v1/upload/single", upload)
+            log["status"] = response.status_code
             
-            if response.status_code == 200:
+            if response.status_code == 413:
+                # Too large to proxy: send the bytes straight to S3 instead
+                log["path"] = "presigned"
+                file.seek(0)
+                result = upload_presigned(upload, log)
+                if result:
+                    log["file_id"] = result['file_id']
+            elif response.status_code == 200:
+                log["path"] = "proxy"
                 result = response.json()
-                print(f"result: {result}")
-                print(f"✅ Upload successful!")
-                print(f"File ID: {result['data']['file_id']}")
-                print(f"Storage URL: {result['data']['storage_url']}")
-                return result
+                log["file_id"] = result['data']['file_id']
+                log["storage_url"] = result['data']['storage_url']
             else:
-                print(f"❌ Upload failed: {response.text}")
-                return None
+                log["error"] = response.text
                 
     except Exception as e:
-        print(f"Upload failed with error: {e}")
-        return None
+        log["error"] = str(e)
+    
+    log["ok"] = result is not None
+    print(json.dumps(log))
+    return result
 
 def main():
     """Main function."""